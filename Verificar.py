@@ -1,429 +1,550 @@
-# Verificar.py
-# Revisión eficiente con pandas/numpy/networkx.
-# Cada bloque está comentado con el código de error y el método de verificación.
-
-import numpy as np
-import networkx as nx
-
-# === Tablas de compatibilidad de faseos (tramo→tramo y tramo→usuario) ===
-# Índices 1..7. Índice 0 no usado.
-COMP_TT = np.zeros((8, 8), dtype=bool)   # compatible entre tramos consecutivos
-COMP_TU = np.zeros((8, 8), dtype=bool)   # compatible tramo→fase_usuario
-
-def _allow_TT(a, bs):
-    for b in bs:
-        COMP_TT[a, b] = True
-
-def _allow_TU(t, us):
-    for u in us:
-        COMP_TU[t, u] = True
-
-# Reglas (idénticas a tu lógica original)
-_allow_TT(1, [1, 4, 6, 7])
-_allow_TT(2, [2, 4, 5, 7])
-_allow_TT(3, [3, 5, 6, 7])
-_allow_TT(4, [1, 2, 4, 7])
-_allow_TT(5, [2, 3, 5, 7])
-_allow_TT(6, [1, 3, 6, 7])
-_allow_TT(7, [1, 2, 3, 4, 5, 6, 7])  # si aplica cualquiera (dejar así para permitir 7 con todos)
-
-_allow_TU(1, [1])
-_allow_TU(2, [2])
-_allow_TU(3, [3])
-_allow_TU(4, [1, 2, 4])
-_allow_TU(5, [2, 3, 5])
-_allow_TU(6, [1, 3, 6])
-_allow_TU(7, [1, 2, 3, 4, 5, 6, 7])  # si aplica cualquiera
-
-def _write_log(lines):
-    # Helper de I/O: acumula y escribe una vez
-    if not lines:
-        return
-    with open('Informe de errores.txt', 'a', encoding='utf-8') as fid:
-        for s in lines:
-            fid.write(s)
-
-def Verificar(DatosT: np.ndarray, DatosL: np.ndarray, DatosN: np.ndarray, CurTemp: np.ndarray):
-    """
-    Revisa coherencia de entrada y topología eléctrica, devolviendo:
-        Error (int) y (posible) DatosT actualizado (se respeta tu firma).
-    Escribe un informe en 'Informe de errores.txt'.
-    """
-
-    log = []
-    circ = int(DatosT[0]) if DatosT.size and not np.isnan(DatosT[0]) else -1
-
-    # =======================
-    # (35, 36, 37) Presencia de datos y curva de carga
-    # =======================
-    
-    # 35 -> No hay info de trafos ni usuarios
-    if (DatosL.size == 0) and (DatosN.size == 0):
-        _write_log([f"\r\nCircuito: {circ}\r\nError: 35\r\nNo hay información de trafos ni de usuarios\r\n"])
-        return 35, DatosT
-
-    # 36 -> Curva de carga está en ceros todas las horas
-    if CurTemp.size and np.nansum(CurTemp) == 0:
-        _write_log([f"\r\nCircuito: {circ}\r\nError: 36\r\nLa curva de carga está en ceros\r\n"])
-        return 36, DatosT
-
-    # 37 -> No tiene curva de carga
-    if CurTemp.size == 0:
-        _write_log([f"\r\nCircuito: {circ}\r\nError: 37\r\nNo tiene curva de carga\r\n"])
-        return 37, DatosT
-
-    # =======================
-    # (2, 3, 4, 1) Coherencia básica de DatosT y slack
-    # =======================
-    
-    tipo = int(DatosT[2]) if DatosT.size > 2 and not np.isnan(DatosT[2]) else -999
-    topo = int(DatosT[5]) if DatosT.size > 5 and not np.isnan(DatosT[5]) else -999  # 1 radial / 0 enmallado
-    vp = DatosT[3] if DatosT.size > 3 else np.nan
-    vs = DatosT[4] if DatosT.size > 4 else np.nan
-    slack = int(DatosT[0]) if DatosT.size and not np.isnan(DatosT[0]) else -1
-
-    # 2 -> tipo trafo desconocido (debe ser 1 o 3)
-    if tipo not in (1, 3):
-        _write_log([f"\r\nCircuito: {circ}\r\nError: 2\r\nSe desconoce el tipo de transformador (1 o 3 - Monofásico o Trifásico)\r\n"])
-        return 2, DatosT
-
-    # 3 -> vp <= vs
-    if not (np.isfinite(vp) and np.isfinite(vs)) or (vp <= vs):
-        _write_log([f"\r\nCircuito: {circ}\r\nError: 3\r\nEl voltaje en el primario es menor o igual al voltaje del secundario\r\n"])
-        return 3, DatosT
-
-    # 4 -> topología desconocida (debe ser 0 o 1)
-    if topo not in (0, 1):
-        _write_log([f"\r\nCircuito: {circ}\r\nError: 4\r\nSe desconoce la topología del circuito (1 o 0 - Radial o Enmallado)\r\n"])
-        return 4, DatosT
-
-    # 1 -> slack no aparece en tramos (si hay tramos)
-    if (DatosL.size != 0) and (slack != -1):
-        ni_nf = DatosL[:, :2].astype(int) if DatosL.size else np.empty((0, 2), int)
-        if ni_nf.size and (not np.any(ni_nf == slack)):
-            _write_log([f"\r\nCircuito: {circ}\r\nError: 1\r\nEl nodo del transformador (slack) no aparece en la hoja de tramos\r\n"])
-            return 1, DatosT
-
-    # =======================
-    # (8, 9, 11, 13, 29) Checks rápidos y vectorizados sobre tramos
-    # =======================
-    
-    if DatosL.size:
-        fase_tramo = DatosL[:, 2].astype(int)
-        montaje = DatosL[:, 4].astype(int)
-        matF = DatosL[:, 6].astype(int)
-        matN = DatosL[:, 8].astype(int)
-        e = DatosL[:, :2].astype(int)
-
-        # 8 -> Faseos de tramos no permitidos por tipo de trafo
-        ok_mono = np.isin(fase_tramo, [1, 2, 4])
-        ok_tri  = np.isin(fase_tramo, [1, 2, 3, 4, 5, 6, 7])
-        if (tipo == 1 and not np.all(ok_mono)) or (tipo == 3 and not np.all(ok_tri)):
-            _write_log([f"\r\nCircuito: {circ}\r\nError: 8\r\nHay faseos en tramos que no corresponden al tipo de transformador\r\n"])
-            return 8, DatosT
-
-        # 9 -> Montaje ∈ {1,2}
-        if not np.all(np.isin(montaje, [1, 2])):
-            _write_log([f"\r\nCircuito: {circ}\r\nError: 9\r\nExisten montajes desconocidos en tramos (1 o 2 - Abierta o Junta)\r\n"])
-            return 9, DatosT
-
-        # 11 -> Material fases ∈ {1,2}
-        if not np.all(np.isin(matF, [1, 2])):
-            _write_log([f"\r\nCircuito: {circ}\r\nError: 11\r\nMaterial de fase desconocido (1 o 2 - Cobre o Aluminio)\r\n"])
-            return 11, DatosT
-
-        # 13 -> Material neutro ∈ {1,2}
-        if not np.all(np.isin(matN, [1, 2])):
-            _write_log([f"\r\nCircuito: {circ}\r\nError: 13\r\nMaterial de neutro desconocido (1 o 2 - Cobre o Aluminio)\r\n"])
-            return 13, DatosT
-
-        # 29 -> Tramos con Ni == Nf (lazos)
-        self_loops = np.where(e[:, 0] == e[:, 1])[0]
-        if self_loops.size:
-            lines = [f"\r\nCircuito: {circ}\r\nError: 29\r\nEn los siguientes tramos Ni == Nf\r\n"]
-            for idx in self_loops:
-                lines.append(f"{int(e[idx,0])}  {int(e[idx,1])}\r\n")
-            _write_log(lines)
-            return 29, DatosT
-
-    # =======================
-    # (14, 15, 33, 34, 16, 18, 19, 20, 27) Checks sobre usuarios
-    # =======================
-    
-    if DatosN.size:
-        nod_u = DatosN[:, 0].astype(int)
-        fase_u = DatosN[:, 1].astype(int)
-        med = DatosN[:, 4].astype(int)
-        est = DatosN[:, 5].astype(int)
-        clas = DatosN[:, 6].astype(int)
-
-        # 14 -> Usuarios en nodos que no están en tramos (si hay tramos)
-        if DatosL.size:
-            nod_linea = np.unique(DatosL[:, :2].astype(int).ravel())
-            faltan = [n for n in np.unique(nod_u) if n not in nod_linea]
-            if len(faltan):
-                lines = [f"\r\nCircuito: {circ}\r\nError: 14\r\nUsuarios en nodos que no aparecen en tramos:\r\n"]
-                for u in faltan:
-                    lines.append(f"{u}\r\n")
-                _write_log(lines)
-                return 14, DatosT
-
-        # 15 -> Todos los usuarios en slack y no hay tramos
-        if (DatosL.size == 0) and np.all(nod_u == slack):
-            _write_log([f"\r\nCircuito: {circ}\r\nError: 15\r\nTodos los usuarios están en el trafo y no hay tramos\r\n"])
-            return 15, DatosT
-
-        # 34 -> Todos los usuarios en slack y sí hay tramos
-        if (DatosL.size != 0) and np.all(nod_u == slack):
-            _write_log([f"\r\nCircuito: {circ}\r\nError: 34\r\nTodos los usuarios están en el trafo y el circuito tiene tramos\r\n"])
-            return 34, DatosT
-
-        # 33 -> Hay usuarios fuera del slack y no hay tramos
-        if (DatosL.size == 0) and np.any(nod_u != slack):
-            _write_log([f"\r\nCircuito: {circ}\r\nError: 33\r\nUsuarios conectados en nodos diferentes al trafo y el circuito no tiene tramos\r\n"])
-            return 33, DatosT
-
-        # 16 -> Fases de usuario válidas por tipo de trafo
-        ok_mono_u = np.isin(fase_u, [1, 2, 4])
-        ok_tri_u  = np.isin(fase_u, [1, 2, 3, 4, 5, 6, 7])
-        if (tipo == 1 and not np.all(ok_mono_u)) or (tipo == 3 and not np.all(ok_tri_u)):
-            lines = [f"\r\nCircuito: {circ}\r\nError: 16\r\nUsuarios con faseo incompatible con el trafo:\r\n"]
-            idx_bad = np.where(~(ok_mono_u if tipo==1 else ok_tri_u))[0]
-            for i in idx_bad:
-                lines.append(f"{int(nod_u[i])}\r\n")
-            _write_log(lines)
-            return 16, DatosT
-
-        # 18 -> Tipo de medidor ∈ {1,2}
-        if not np.all(np.isin(med, [1, 2])):
-            lines = [f"\r\nCircuito: {circ}\r\nError: 18\r\nUsuarios con tipo de medidor desconocido:\r\n"]
-            for i in np.where(~np.isin(med, [1, 2]))[0]:
-                lines.append(f"{int(nod_u[i])}\r\n")
-            _write_log(lines)
-            return 18, DatosT
-
-        # 19 -> Estrato ∈ {0..6}
-        if not np.all(np.isin(est, [0, 1, 2, 3, 4, 5, 6])):
-            lines = [f"\r\nCircuito: {circ}\r\nError: 19\r\nUsuarios con estrato desconocido:\r\n"]
-            for i in np.where(~np.isin(est, [0,1,2,3,4,5,6]))[0]:
-                lines.append(f"{int(nod_u[i])}\r\n")
-            _write_log(lines)
-            return 19, DatosT
-
-        # 20 -> Clase de servicio ∈ {1..11}
-        if not np.all(np.isin(clas, np.arange(1, 12))):
-            lines = [f"\r\nCircuito: {circ}\r\nError: 20\r\nUsuarios con clase de servicio desconocida:\r\n"]
-            for i in np.where(~np.isin(clas, np.arange(1, 12)))[0]:
-                lines.append(f"{int(nod_u[i])}\r\n")
-            _write_log(lines)
-            return 20, DatosT         
-            
-        # 27 -> Todos los usuarios conectados a la misma fase (solo reporto si es radial)
-        if topo == 1 and DatosN.size:
-            # excluir posibles NaN si los hubiera
-            fvals = np.array(fase_u, dtype=float)
-            fvals = fvals[~np.isnan(fvals)].astype(int)
-            if fvals.size and np.unique(fvals).size == 1:
-                f = int(np.unique(fvals)[0])
-                # Etiquetas directas por código de fase de usuario:
-                fase_txt = {
-                    1: "la fase A",
-                    2: "la fase B",
-                    3: "la fase C",
-                    4: "las fases A-B",
-                    5: "las fases B-C",
-                    6: "las fases C-A",
-                    7: "las fases A-B-C",
-                }.get(f, None)
-        
-                lines = [f"\r\nCircuito: {circ}\r\nError: 27\r\n"]
-                if fase_txt is None:
-                    lines.append("Distribución de fases no válida\r\n")
-                else:
-                    lines.append(f"Todos los usuarios están conectados a {fase_txt}\r\n")
-                _write_log(lines)
-                return 27, DatosT
-
-    # =======================
-    # GRAFO con NetworkX para (22, 24, 26) y para reglas adicionales
-    # =======================
-    
-    if DatosL.size:
-        edges = DatosL[:, :2].astype(int)
-        phases = DatosL[:, 2].astype(int)
-
-        # Construir grafo simple sin paralelos (para topología)
-        G = nx.Graph()
-        G.add_edges_from(map(tuple, np.sort(edges, axis=1)))  # no multiedges
-
-        # 22 -> Islas (componentes conexas > 1)
-        if nx.number_connected_components(G) > 1:
-            _write_log([f"\r\nCircuito: {circ}\r\nError: 22\r\nEl circuito tiene islas\r\n"])
-            return 22, DatosT
-
-        # Conteo de nodos/aristas efectivas
-        N = G.number_of_nodes()
-        M = G.number_of_edges()
-
-        # 26 -> Es radial (M = N-1) y viene marcado enmallado (topo=0)
-        if (M == N - 1) and (topo == 0):
-            _write_log([f"\r\nCircuito: {circ}\r\nError: 26\r\nEl circuito es radial pero viene marcado como enmallado\r\n"])
-            return 26, DatosT
-
-        # 24 -> Tiene anillos (M >= N) y viene marcado radial (topo=1)
-        if (M >= N) and (topo == 1):
-            _write_log([f"\r\nCircuito: {circ}\r\nError: 24\r\nEl circuito es enmallado pero viene marcado como radial\r\n"])
-            return 24, DatosT
-
-        # =======================
-        # Verificaciones de faseo según topología usando BFS/puentes
-        # =======================
-
-        # Preparar índice de faseo por arista (sin paralelos, normalizado por orden)
-        # Usamos dict con llave (min(u,v), max(u,v)) -> fase
-        phase_by_edge = {}
-        for (u, v), f in zip(edges, phases):
-            key = (min(int(u), int(v)), max(int(u), int(v)))
-            # Si hay paralelos, nos quedamos con el primer visto (o podrías validar que todos coinciden)
-            if key not in phase_by_edge:
-                phase_by_edge[key] = int(f)
-
-        # --- RADIAL: (25) faseo en caminos consecutivos, (23) conexión de cargas vs tramo ---
-        if topo == 1:
-            # Orientar árbol por BFS desde slack (si slack no está, tomar un nodo cualquiera)
-            root = slack if slack in G else next(iter(G.nodes))
-            parent = {root: None}
-            pedge = {}  # para cada nodo, arista con su padre
-            from collections import deque
-            dq = deque([root])
-
-            while dq:
-                u = dq.popleft()
-                for v in G.neighbors(u):
-                    if v in parent and parent[v] is not None and parent[v] == u:
-                        continue
-                    if v not in parent:
-                        parent[v] = u
-                        key = (min(u, v), max(u, v))
-                        pedge[v] = key
-                        dq.append(v)
-
-            # (25) tramo→tramo: para cada nodo con padre y abuelo, comparar faseos
-            bad_pairs = []
-            for v, p in parent.items():
-                if v == root or p is None:
-                    continue
-                gp = parent.get(p, None)
-                if gp is None:
-                    continue
-                e1 = pedge[v]     # (p, v)
-                e2 = pedge[p]     # (gp, p)
-                f1 = phase_by_edge.get(e1, 0)
-                f2 = phase_by_edge.get(e2, 0)
-                if f1 == 0 or f2 == 0 or not COMP_TT[f2, f1]:
-                    bad_pairs.append((e2[0], e2[1], e1[0], e1[1]))
-
-            if bad_pairs:
-                lines = [f"\r\nCircuito: {circ}\r\nError: 25\r\n"]
-                for (a, b, c, d) in bad_pairs:
-                    lines.append(f"Existe mal faseo de {a} - {b} a {c} - {d}\r\n")
-                _write_log(lines)
-                return 25, DatosT
-
-            # (23) tramo→usuario: para cada nodo con usuarios, checar fase tramo entrante
-            if DatosN.size:
-                nod_u = DatosN[:, 0].astype(int)
-                fase_u = DatosN[:, 1].astype(int)
-                # agrupar usuarios por nodo
-                from collections import defaultdict
-                users_by_node = defaultdict(list)
-                for n, fu in zip(nod_u, fase_u):
-                    users_by_node[int(n)].append(int(fu))
-
-                bad_nodes = []
-                for v in users_by_node:
-                    # fase del tramo que alimenta v (p→v). Para el root, no hay tramo entrante.
-                    if v == root or v not in pedge:
-                        # trafo monofásico: usuarios en slack deben estar en {1,2,4}
-                        if v == root and tipo == 1:
-                            if not set(users_by_node[v]).issubset({1, 2, 4}):
-                                bad_nodes.append(v)
-                        continue
-                    ftramo = phase_by_edge.get(pedge[v], 0)
-                    if ftramo == 0:
-                        continue
-                    # todos usuarios de v deben ser compatibles con ftramo
-                    bad_local = [fu for fu in users_by_node[v] if not COMP_TU[ftramo, fu]]
-                    if bad_local:
-                        bad_nodes.append(v)
-
-                if bad_nodes:
-                    lines = [f"\r\nCircuito: {circ}\r\nError: 23\r\n"]
-                    for n in bad_nodes:
-                        lines.append(f"Hay una carga mal conectada en el nodo {n}\r\n")
-                    _write_log(lines)
-                    return 23, DatosT
-
-        # --- ENMALLADO: (30) faseo inconsistente en secuencias locales, (31) cargas no alimentables ---
-        else:
-            # Idea: usar componentes biconexas para identificar "regiones de anillo".
-            # (30) Para cada biconexa, probar triples (u–v–w) y verificar COMP_TT entre aristas contiguas.
-            bad30 = []
-            for bic in nx.biconnected_components(G):
-                sub = G.subgraph(bic)
-                # iterar sobre caminos de longitud 2 dentro de la biconexa
-                for v in sub.nodes:
-                    nbrs = list(sub.neighbors(v))
-                    for i in range(len(nbrs)):
-                        for j in range(i + 1, len(nbrs)):
-                            a, b = nbrs[i], v
-                            c = nbrs[j]
-                            e1 = (min(a, b), max(a, b))
-                            e2 = (min(b, c), max(b, c))
-                            f1 = phase_by_edge.get(e1, 0)
-                            f2 = phase_by_edge.get(e2, 0)
-                            if f1 == 0 or f2 == 0:
-                                continue
-                            if not COMP_TT[f1, f2]:
-                                bad30.append((e1[0], e1[1], e2[0], e2[1]))
-            if bad30:
-                lines = [f"\r\nCircuito: {circ}\r\nError: 30\r\nLos siguientes tramos de líneas tienen errores de faseo\r\n"]
-                for (a, b, c, d) in bad30:
-                    lines.append(f"De {a} - {b} a {c} {d}\r\n")
-                _write_log(lines)
-                return 30, DatosT
-
-            # (31) Usuarios dentro de mallas: al menos un tramo incidente compatible
-            if DatosN.size:
-                nod_u = DatosN[:, 0].astype(int)
-                fase_u = DatosN[:, 1].astype(int)
-                # nodos que están en alguna biconexa de tamaño >= 3 (anillo)
-                nodes_in_rings = set()
-                for bic in nx.biconnected_components(G):
-                    if len(bic) >= 3:
-                        nodes_in_rings.update(bic)
-
-                bad31 = []
-                for node, fu in zip(nod_u, fase_u):
-                    # tramos incidentes
-                    ok = False
-                    for v in G.neighbors(node) if node in G else []:
-                        ekey = (min(node, v), max(node, v))
-                        ft = phase_by_edge.get(ekey, 0)
-                        if ft != 0 and COMP_TU[ft, int(fu)]:
-                            ok = True
-                            break
-                    if not ok:
-                        # si no hay tramo compatible que pueda alimentarlo en malla, marcarlo
-                        bad31.append(int(node))
-
-                if bad31:
-                    lines = [f"\r\nCircuito: {circ}\r\nError: 31\r\n"]
-                    for n in sorted(set(bad31)):
-                        lines.append(f"Hay una carga mal conectada en el nodo {n}\r\n")
-                    _write_log(lines)
-                    return 31, DatosT
-
-    # Si nada falló:
-    _write_log([f"\r\nCircuito: {circ}\r\nError: 0\r\nCircuito normal\r\n"])
-    return 0, DatosT
+# Verificar.py
+# Revisión eficiente con numpy (grafo en arreglos CSR, ver grafo.py).
+# Cada bloque está comentado con el código de error y el método de verificación.
+
+import time
+from contextlib import nullcontext
+from functools import cached_property
+
+import numpy as np
+
+from grafo import GrafoCSR, Nodos, bfs, etiquetas_biconexas, orden_subgrafo
+from informe import Hallazgo, Resultado, Sumidero, SumideroTexto
+from instrumento import ETAPA_CHECK, Instrumento, Medicion
+from reglas import BASE, BIT_U, LIBRE, Reglas, valido
+
+# === Tablas de compatibilidad de faseos (tramo→tramo y tramo→usuario) ===
+# Índices 1..7. Índice 0 no usado. Son las de las reglas base (ver reglas.py);
+# cada circuito puede verificarse con otro conjunto de reglas.
+COMP_TT = BASE.comp_tt   # compatible entre tramos consecutivos
+COMP_TU = BASE.comp_tu   # compatible tramo→fase_usuario
+
+def _codigo_fase(f):
+    # Códigos de fase fuera de 1..7 se tratan como 0 (desconocido) al indexar las tablas
+    return np.where((f >= 1) & (f <= 7), f, 0)
+
+# Textos de los checks que sesion.py y prefiltro.py también evalúan por su cuenta
+MENSAJES = {
+    35: "No hay información de trafos ni de usuarios\r\n",
+    36: "La curva de carga está en ceros\r\n",
+    37: "No tiene curva de carga\r\n",
+    2: "Se desconoce el tipo de transformador (1 o 3 - Monofásico o Trifásico)\r\n",
+    3: "El voltaje en el primario es menor o igual al voltaje del secundario\r\n",
+    4: "Se desconoce la topología del circuito (1 o 0 - Radial o Enmallado)\r\n",
+    1: "El nodo del transformador (slack) no aparece en la hoja de tramos\r\n",
+    14: "Usuarios en nodos que no aparecen en tramos:\r\n",
+    22: "El circuito tiene islas\r\n",
+    24: "El circuito es enmallado pero viene marcado como radial\r\n",
+    26: "El circuito es radial pero viene marcado como enmallado\r\n",
+}
+
+def _sin_fase_compatible(masc_nodo, v, fase_u, fuera):
+    # Por usuario: su fase no está en la máscara de su nodo (v = -1: fuera del grafo -> `fuera`)
+    m = np.where(v >= 0, masc_nodo[np.maximum(v, 0)], fuera)
+    return (m & BIT_U[fase_u]) == 0
+
+def _carga_mal_conectada(codigo, nodos):
+    return Hallazgo(codigo, [f"Hay una carga mal conectada en el nodo {n}\r\n" for n in nodos], nodos=nodos)
+
+def _por_nodo(codigo, titulo, nodos):
+    # Hallazgo con un título y un nodo por línea
+    return Hallazgo(codigo, [titulo] + [f"{n}\r\n" for n in nodos], nodos=nodos)
+
+
+_SIN_MEDIR = nullcontext()   # etapa sin instrumento
+
+
+class _Analisis:
+    """
+    Intermedios compartidos por todos los checks de un circuito: columnas ya
+    convertidas a int, grafo, árbol BFS y biconexas. Cada uno se calcula una sola
+    vez y solo si algún check lo pide.
+    """
+
+    def __init__(self, DatosT, DatosL, DatosN, CurTemp, med: Medicion = None, reglas: Reglas = None):
+        self.DatosT, self.DatosL, self.DatosN, self.CurTemp = DatosT, DatosL, DatosN, CurTemp
+        self.fallados = set()   # códigos que ya fallaron (para checks dependientes)
+        self.med = med          # Medicion si se está instrumentando
+        self.reglas = reglas or BASE
+
+        self.circ = int(DatosT[0]) if DatosT.size and not np.isnan(DatosT[0]) else -1
+        self.tipo = int(DatosT[2]) if DatosT.size > 2 and not np.isnan(DatosT[2]) else -999
+        self.topo = int(DatosT[5]) if DatosT.size > 5 and not np.isnan(DatosT[5]) else -999  # 1 radial / 0 enmallado
+        self.vp = DatosT[3] if DatosT.size > 3 else np.nan
+        self.vs = DatosT[4] if DatosT.size > 4 else np.nan
+        self.slack = self.circ
+
+    # --- columnas de tramos ---
+    @cached_property
+    def edges(self):
+        return self.DatosL[:, :2].astype(int) if self.DatosL.size else np.empty((0, 2), dtype=int)
+
+    @cached_property
+    def fase_tramo(self):
+        return self.DatosL[:, 2].astype(int) if self.DatosL.size else np.empty(0, dtype=int)
+
+    # --- columnas de usuarios (vacías si la tabla no tiene datos, p. ej. (0, 0)) ---
+    @cached_property
+    def nod_u(self):
+        return self.DatosN[:, 0].astype(int) if self.DatosN.size else np.empty(0, dtype=int)
+
+    @cached_property
+    def fase_u(self):
+        return self.DatosN[:, 1].astype(int) if self.DatosN.size else np.empty(0, dtype=int)
+
+    # --- ids de nodo internados (tramos en el orden del grafo, luego usuarios) ---
+    @cached_property
+    def internado(self):
+        return Nodos(np.sort(self.edges, axis=1), self.nod_u)
+
+    @cached_property
+    def u_idx(self):
+        # índice denso del nodo de cada usuario
+        return self.internado.otros
+
+    @cached_property
+    def u_grafo(self):
+        # índice en el grafo del nodo de cada usuario (-1 si no está en tramos)
+        return self.internado.en_tramos(self.u_idx)
+
+    @cached_property
+    def slack_grafo(self):
+        # índice del slack en el grafo (-1 si no está en tramos)
+        if self.slack == -1:
+            return -1
+        return int(self.internado.en_tramos(self.internado.indice(self.slack)))
+
+    def _etapa(self, nombre):
+        return _SIN_MEDIR if self.med is None else self.med.etapa(nombre)
+
+    # --- grafo y recorridos ---
+    @cached_property
+    def G(self):
+        # grafo simple sin paralelos (para topología)
+        with self._etapa("grafo"):
+            return GrafoCSR(self.edges, self.internado)
+
+    @cached_property
+    def arbol(self):
+        # BFS desde el slack (si no está, desde el primer nodo): (root, orden, padre, arista_padre)
+        G = self.G
+        root = max(self.slack_grafo, 0)
+        with self._etapa("bfs"):
+            return (root,) + bfs(G, root)
+
+    @cached_property
+    def fase_arista(self):
+        # faseo por arista única (primera fila vista si hay paralelos)
+        return self.fase_tramo[self.G.fila]
+
+    @cached_property
+    def ext(self):
+        # extremos (min, max) de cada arista única con ids originales
+        return np.sort(self.G.nodos[self.G.extremos], axis=1)
+
+    @cached_property
+    def fase_in(self):
+        # fase del tramo entrante por nodo en el árbol BFS (0 si no tiene padre)
+        # (arista_padre = -1 apunta al 0 agregado al final)
+        return np.append(self.fase_arista, 0)[self.arbol[3]]
+
+    @cached_property
+    def biconexas(self):
+        G = self.G
+        with self._etapa("biconexas"):
+            return etiquetas_biconexas(G)
+
+
+# =======================
+# (35, 36, 37) Presencia de datos y curva de carga
+# =======================
+
+def _e35(a):
+    # No hay info de trafos ni usuarios
+    if (a.DatosL.size == 0) and (a.DatosN.size == 0):
+        return Hallazgo(35, [MENSAJES[35]])
+
+_BLOQUE_CURVA = 1 << 20   # valores por bloque al sumar curvas grandes
+
+def _suma_curva(C):
+    # nansum por bloques de filas: sobre un memmap (almacen.py) no se materializa
+    # la curva completa, solo un bloque a la vez
+    if C.size <= _BLOQUE_CURVA:
+        return np.nansum(C)
+    filas = max(_BLOQUE_CURVA // max(C[0].size, 1), 1)
+    return sum(np.nansum(C[i:i + filas]) for i in range(0, C.shape[0], filas))
+
+def _e36(a):
+    # Curva de carga está en ceros todas las horas
+    if a.CurTemp.size and _suma_curva(a.CurTemp) == 0:
+        return Hallazgo(36, [MENSAJES[36]])
+
+def _e37(a):
+    # No tiene curva de carga
+    if a.CurTemp.size == 0:
+        return Hallazgo(37, [MENSAJES[37]])
+
+# =======================
+# (2, 3, 4, 1) Coherencia básica de DatosT y slack
+# =======================
+
+def _e2(a):
+    # tipo trafo desconocido (debe ser 1 o 3)
+    if a.tipo not in a.reglas.fases:
+        return Hallazgo(2, [MENSAJES[2]])
+
+def _e3(a):
+    # vp <= vs
+    if not (np.isfinite(a.vp) and np.isfinite(a.vs)) or (a.vp <= a.vs):
+        return Hallazgo(3, [MENSAJES[3]])
+
+def _e4(a):
+    # topología desconocida (debe ser 0 o 1)
+    if a.topo not in (0, 1):
+        return Hallazgo(4, [MENSAJES[4]])
+
+def _e1(a):
+    # slack no aparece en tramos (si hay tramos)
+    if (a.DatosL.size != 0) and (a.slack != -1):
+        if a.edges.size and a.slack_grafo < 0:
+            return Hallazgo(1, [MENSAJES[1]])
+
+# =======================
+# (8, 9, 11, 13, 29) Checks rápidos y vectorizados sobre tramos
+# =======================
+
+def _e8(a):
+    # Faseos de tramos no permitidos por tipo de trafo
+    fases = a.reglas.fases.get(a.tipo)
+    if a.DatosL.size and fases is not None:
+        if not np.all(valido(fases, a.fase_tramo)):
+            return Hallazgo(8, ["Hay faseos en tramos que no corresponden al tipo de transformador\r\n"])
+
+def _e9(a):
+    # Montaje ∈ {1,2}
+    if a.DatosL.size and not np.all(valido(a.reglas.montaje, a.DatosL[:, 4].astype(int))):
+        return Hallazgo(9, ["Existen montajes desconocidos en tramos (1 o 2 - Abierta o Junta)\r\n"])
+
+def _e11(a):
+    # Material fases ∈ {1,2}
+    if a.DatosL.size and not np.all(valido(a.reglas.material_fase, a.DatosL[:, 6].astype(int))):
+        return Hallazgo(11, ["Material de fase desconocido (1 o 2 - Cobre o Aluminio)\r\n"])
+
+def _e13(a):
+    # Material neutro ∈ {1,2}
+    if a.DatosL.size and not np.all(valido(a.reglas.material_neutro, a.DatosL[:, 8].astype(int))):
+        return Hallazgo(13, ["Material de neutro desconocido (1 o 2 - Cobre o Aluminio)\r\n"])
+
+def _e29(a):
+    # Tramos con Ni == Nf (lazos)
+    if a.DatosL.size:
+        e = a.edges
+        self_loops = np.where(e[:, 0] == e[:, 1])[0]
+        if self_loops.size:
+            tramos = [tuple(t) for t in e[self_loops].tolist()]
+            lines = ["En los siguientes tramos Ni == Nf\r\n"]
+            for ni, nf in tramos:
+                lines.append(f"{ni}  {nf}\r\n")
+            return Hallazgo(29, lines, tramos=tramos)
+
+# =======================
+# (14, 15, 33, 34, 16, 18, 19, 20, 27) Checks sobre usuarios
+# =======================
+
+def _e14(a):
+    # Usuarios en nodos que no están en tramos (si hay tramos)
+    if a.DatosN.size and a.DatosL.size:
+        falta = a.u_grafo < 0
+        if np.any(falta):
+            faltan = np.unique(a.nod_u[falta])
+            return _por_nodo(14, MENSAJES[14], faltan.tolist())
+
+def _e15(a):
+    # Todos los usuarios en slack y no hay tramos
+    if a.DatosN.size and (a.DatosL.size == 0) and np.all(a.nod_u == a.slack):
+        return Hallazgo(15, ["Todos los usuarios están en el trafo y no hay tramos\r\n"])
+
+def _e34(a):
+    # Todos los usuarios en slack y sí hay tramos
+    if a.DatosN.size and (a.DatosL.size != 0) and np.all(a.nod_u == a.slack):
+        return Hallazgo(34, ["Todos los usuarios están en el trafo y el circuito tiene tramos\r\n"])
+
+def _e33(a):
+    # Hay usuarios fuera del slack y no hay tramos
+    if a.DatosN.size and (a.DatosL.size == 0) and np.any(a.nod_u != a.slack):
+        return Hallazgo(33, ["Usuarios conectados en nodos diferentes al trafo y el circuito no tiene tramos\r\n"])
+
+def _e16(a):
+    # Fases de usuario válidas por tipo de trafo
+    fases = a.reglas.fases.get(a.tipo)
+    if a.DatosN.size and fases is not None:
+        malo = ~valido(fases, a.fase_u)
+        if np.any(malo):
+            return _por_nodo(16, "Usuarios con faseo incompatible con el trafo:\r\n", a.nod_u[malo].tolist())
+
+def _e18(a):
+    # Tipo de medidor ∈ {1,2}
+    if a.DatosN.size:
+        malo = ~valido(a.reglas.medidor, a.DatosN[:, 4].astype(int))
+        if np.any(malo):
+            return _por_nodo(18, "Usuarios con tipo de medidor desconocido:\r\n", a.nod_u[malo].tolist())
+
+def _e19(a):
+    # Estrato ∈ {0..6}
+    if a.DatosN.size:
+        malo = ~valido(a.reglas.estrato, a.DatosN[:, 5].astype(int))
+        if np.any(malo):
+            return _por_nodo(19, "Usuarios con estrato desconocido:\r\n", a.nod_u[malo].tolist())
+
+def _e20(a):
+    # Clase de servicio ∈ {1..11}
+    if a.DatosN.size:
+        malo = ~valido(a.reglas.clase_servicio, a.DatosN[:, 6].astype(int))
+        if np.any(malo):
+            return _por_nodo(20, "Usuarios con clase de servicio desconocida:\r\n", a.nod_u[malo].tolist())
+
+def _e27(a):
+    # Todos los usuarios conectados a la misma fase (solo reporto si es radial)
+    if a.topo == 1 and a.DatosN.size:
+        # excluir posibles NaN si los hubiera
+        fvals = np.array(a.fase_u, dtype=float)
+        fvals = fvals[~np.isnan(fvals)].astype(int)
+        if fvals.size and np.unique(fvals).size == 1:
+            f = int(np.unique(fvals)[0])
+            # Etiquetas directas por código de fase de usuario:
+            fase_txt = {
+                1: "la fase A",
+                2: "la fase B",
+                3: "la fase C",
+                4: "las fases A-B",
+                5: "las fases B-C",
+                6: "las fases C-A",
+                7: "las fases A-B-C",
+            }.get(f, None)
+            if fase_txt is None:
+                return Hallazgo(27, ["Distribución de fases no válida\r\n"])
+            return Hallazgo(27, [f"Todos los usuarios están conectados a {fase_txt}\r\n"])
+
+# =======================
+# GRAFO (CSR, ver grafo.py) para (22, 24, 26) y para reglas adicionales
+# =======================
+
+def _e22(a):
+    # Islas (componentes conexas > 1): el BFS desde el slack no alcanza todos los nodos
+    if a.DatosL.size and a.arbol[1].size < a.G.N:
+        return Hallazgo(22, [MENSAJES[22]])
+
+def _e26(a):
+    # Es radial (M = N-1) y viene marcado enmallado (topo=0)
+    if a.DatosL.size and 22 not in a.fallados:
+        if (a.G.M == a.G.N - 1) and (a.topo == 0):
+            return Hallazgo(26, [MENSAJES[26]])
+
+def _e24(a):
+    # Tiene anillos (M >= N) y viene marcado radial (topo=1)
+    if a.DatosL.size and 22 not in a.fallados:
+        if (a.G.M >= a.G.N) and (a.topo == 1):
+            return Hallazgo(24, [MENSAJES[24]])
+
+# =======================
+# Verificaciones de faseo según topología usando BFS/biconexas
+# (solo si la topología declarada es conocida y coincide con la real)
+# =======================
+
+def _faseo(a, topo):
+    return a.DatosL.size and a.topo == topo and not (a.fallados & {4, 22, 24, 26})
+
+def _e25(a):
+    # RADIAL: faseo en caminos consecutivos. Para cada nodo con padre y abuelo
+    # (en orden BFS) f2 = fase entrante del padre, f1 = la del nodo
+    if not _faseo(a, 1):
+        return None
+    _, orden, parent, pedge = a.arbol
+    p = parent[orden]
+    con_abuelo = (p >= 0) & (parent[np.maximum(p, 0)] >= 0)
+    v = orden[con_abuelo]
+    p = p[con_abuelo]
+    f1 = _codigo_fase(a.fase_in[v])
+    f2 = _codigo_fase(a.fase_in[p])
+    malo = (f1 == 0) | (f2 == 0) | ~a.reglas.comp_tt[f2, f1]
+    if np.any(malo):
+        e1 = a.ext[pedge[v[malo]]]     # (p, v)
+        e2 = a.ext[pedge[p[malo]]]     # (gp, p)
+        pares = [tuple(t2 + t1) for t2, t1 in zip(e2.tolist(), e1.tolist())]
+        lines = []
+        for (x, y, z, w) in pares:
+            lines.append(f"Existe mal faseo de {x} - {y} a {z} - {w}\r\n")
+        return Hallazgo(25, lines, tramos=pares)
+
+def _e23(a):
+    # RADIAL: cada usuario contra la fase del tramo que alimenta su nodo
+    if not (_faseo(a, 1) and a.DatosN.size):
+        return None
+    # máscara por nodo: fases de usuario que admite su tramo entrante (sin fase: libre)
+    root = a.arbol[0]
+    fase_in = _codigo_fase(a.fase_in)
+    masc = np.where(fase_in != 0, a.reglas.mascara_tu[fase_in], LIBRE)
+    # trafo monofásico: usuarios en slack deben estar en {1,2,4}
+    masc[root] = a.reglas.mascara_slack.get(a.tipo, LIBRE)
+    malo = _sin_fase_compatible(masc, a.u_grafo, _codigo_fase(a.fase_u), LIBRE)
+
+    if np.any(malo):
+        # nodos con alguna carga mala, en orden de primera aparición del nodo
+        u, K = a.u_idx, a.internado.K
+        primero = np.full(K, u.size)
+        np.minimum.at(primero, u, np.arange(u.size))
+        nodo_malo = np.zeros(K, dtype=bool)
+        nodo_malo[u[malo]] = True
+        k = np.flatnonzero(nodo_malo)
+        bad_nodes = a.internado.ids[k[np.argsort(primero[k])]].tolist()
+        return _carga_mal_conectada(23, bad_nodes)
+
+def _e30(a):
+    # ENMALLADO: en cada biconexa ("región de anillo") los tramos contiguos (u–v–w)
+    # deben ser compatibles (COMP_TT). Con solo 7 códigos de fase basta un histograma
+    # de fases por (biconexa, nodo) para saber si el nodo tiene algún par
+    # incompatible; los pares exactos solo se enumeran en los nodos que fallan.
+    if not _faseo(a, 0):
+        return None
+    G = a.G
+    N = G.N
+    fase_arista = a.fase_arista
+    comps, bic_arista = a.biconexas
+    src = np.repeat(np.arange(N), G.grado())
+    f_inc = _codigo_fase(fase_arista[G.arista])
+    clave = bic_arista[G.arista] * N + src          # (biconexa, nodo) por incidencia
+    claves, inv = np.unique(clave, return_inverse=True)
+    hist = np.bincount(inv.ravel() * 8 + f_inc, minlength=claves.size * 8).reshape(-1, 8)
+    hist[:, 0] = 0
+    pres = hist > 0
+    cruz = pres[:, :, None] & pres[:, None, :] & a.reglas.incomp_tt
+    diag = np.arange(8)
+    cruz[:, diag, diag] &= hist >= 2
+    falla = cruz.any(axis=(1, 2))
+    if not np.any(falla):
+        return None
+
+    bad30 = []
+    bic_falla = claves[falla] // N
+    nodo_falla = claves[falla] % N
+    for b in np.unique(bic_falla).tolist():
+        marcados = np.zeros(N, dtype=bool)
+        marcados[nodo_falla[bic_falla == b]] = True
+        # mismo orden de nodos/vecinos que el recorrido original de la biconexa
+        for v in orden_subgrafo(G, comps[b]).tolist():
+            if not marcados[v]:
+                continue
+            e_loc = G.arista[G.indptr[v]:G.indptr[v + 1]]
+            e_loc = e_loc[bic_arista[e_loc] == b]
+            f_loc = _codigo_fase(fase_arista[e_loc])
+            for i in range(e_loc.size - 1):
+                f1 = f_loc[i]
+                if f1 == 0:
+                    continue
+                f2 = f_loc[i + 1:]
+                malos = np.flatnonzero((f2 != 0) & ~a.reglas.comp_tt[f1, f2]) + i + 1
+                e1 = a.ext[e_loc[i]].tolist()
+                for e2 in a.ext[e_loc[malos]].tolist():
+                    bad30.append(tuple(e1 + e2))
+    if bad30:
+        lines = ["Los siguientes tramos de líneas tienen errores de faseo\r\n"]
+        for (x, y, z, w) in bad30:
+            lines.append(f"De {x} - {y} a {z} {w}\r\n")
+        return Hallazgo(30, lines, tramos=bad30)
+
+def _e31(a):
+    # ENMALLADO: usuarios dentro de mallas, al menos un tramo incidente compatible
+    if not (_faseo(a, 0) and a.DatosN.size):
+        return None
+    # máscara por nodo: OR de las fases de usuario que admite algún tramo incidente
+    G = a.G
+    masc = np.zeros(G.N, dtype=np.uint8)
+    m = a.reglas.mascara_tu[_codigo_fase(a.fase_arista)]
+    np.bitwise_or.at(masc, G.extremos[:, 0], m)
+    np.bitwise_or.at(masc, G.extremos[:, 1], m)
+    # si no hay tramo compatible que pueda alimentarlo en malla, marcarlo
+    malo = _sin_fase_compatible(masc, a.u_grafo, _codigo_fase(a.fase_u), 0)
+    if np.any(malo):
+        return _carga_mal_conectada(31, np.unique(a.nod_u[malo]).tolist())
+
+
+# Orden de evaluación (el mismo del informe original)
+_CHECKS = (
+    (35, _e35), (36, _e36), (37, _e37),
+    (2, _e2), (3, _e3), (4, _e4), (1, _e1),
+    (8, _e8), (9, _e9), (11, _e11), (13, _e13), (29, _e29),
+    (14, _e14), (15, _e15), (34, _e34), (33, _e33), (16, _e16), (18, _e18), (19, _e19), (20, _e20), (27, _e27),
+    (22, _e22), (26, _e26), (24, _e24),
+    (25, _e25), (23, _e23), (30, _e30), (31, _e31),
+)
+
+def verificar_circuito(DatosT: np.ndarray, DatosL: np.ndarray, DatosN: np.ndarray, CurTemp: np.ndarray,
+                       todos: bool = False, instrumento: Instrumento = None,
+                       reglas: Reglas = None) -> Resultado:
+    """
+    Núcleo de Verificar sin I/O: devuelve el Resultado estructurado del circuito
+    (con todos=False se detiene en el primer hallazgo).
+    Con `instrumento` (ver instrumento.py) se mide cada etapa y se registra.
+    `reglas` (ver reglas.py) elige la norma; por defecto las reglas base.
+    """
+    if instrumento is not None:
+        return _verificar_medido(DatosT, DatosL, DatosN, CurTemp, todos, instrumento, reglas)
+    a = _Analisis(DatosT, DatosL, DatosN, CurTemp, reglas=reglas)
+    res = Resultado(a.circ)
+    for codigo, check in _CHECKS:
+        h = check(a)
+        if h:
+            res.hallazgos.append(h)
+            if not todos:
+                break
+            a.fallados.add(codigo)
+    return res
+
+
+def _verificar_medido(DatosT, DatosL, DatosN, CurTemp, todos, instrumento, reglas=None):
+    # Igual que verificar_circuito, con cada check dentro de su etapa
+    t0 = time.perf_counter()
+    med = Medicion()
+    a = _Analisis(DatosT, DatosL, DatosN, CurTemp, med, reglas)
+    res = Resultado(a.circ)
+    for codigo, check in _CHECKS:
+        with med.etapa(ETAPA_CHECK[codigo]):
+            h = check(a)
+        if h:
+            res.hallazgos.append(h)
+            if not todos:
+                break
+            a.fallados.add(codigo)
+    med.cerrar(a, res, time.perf_counter() - t0)
+    instrumento.registrar(med)
+    return res
+
+
+def Verificar(DatosT: np.ndarray, DatosL: np.ndarray, DatosN: np.ndarray, CurTemp: np.ndarray,
+              todos: bool = False, sumidero: Sumidero = None, resultado: bool = False,
+              instrumento: Instrumento = None, reglas: Reglas = None):
+    """
+    Revisa coherencia de entrada y topología eléctrica, devolviendo:
+        Error (int) y (posible) DatosT actualizado (se respeta tu firma).
+    Con todos=True no se detiene en el primer error: corre todos los checks
+    independientes en una sola pasada y devuelve, en lugar de Error, la lista
+    [(codigo, lineas_de_detalle)] (vacía si el circuito es normal).
+    Con resultado=True devuelve en su lugar el Resultado estructurado (ver informe.py).
+    El informe se escribe en `sumidero`; por defecto se agrega a
+    'Informe de errores.txt' en el directorio actual.
+    `instrumento` (opcional) recibe los tiempos por etapa (ver instrumento.py).
+    `reglas` (opcional) es el conjunto de reglas de la norma (ver reglas.py).
+    """
+
+    res = verificar_circuito(DatosT, DatosL, DatosN, CurTemp, todos, instrumento, reglas)
+    if sumidero is None:
+        with SumideroTexto('Informe de errores.txt', buffer=1) as s:
+            s.escribir(res)
+    else:
+        sumidero.escribir(res)
+
+    if resultado:
+        return res, DatosT
+    if todos:
+        return [(h.codigo, h.lineas) for h in res.hallazgos], DatosT
+    return res.codigo, DatosT
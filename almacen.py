@@ -0,0 +1,212 @@
+# almacen.py
+# Almacén columnar en disco para flotas grandes.
+# Cada tabla (trafos, tramos, usuarios, curvas) es un archivo binario float64
+# sin la columna de id de circuito, con las filas de cada circuito contiguas;
+# un índice de offsets por circuito permite entregar a Verificar vistas
+# memmap de un circuito a la vez, sin cargar la flota en RAM.
+#
+#   almacen/
+#     almacen.json        manifiesto (columnas y filas de cada tabla)
+#     circuitos.npy       id de circuito, en orden de escritura
+#     offsets.npy         (3, K+1) inicio de cada circuito en tramos/usuarios/curvas
+#     trafos.bin  tramos.bin  usuarios.bin  curvas.bin
+
+import json
+import os
+
+import numpy as np
+
+from Verificar import verificar_circuito
+from lote import _agrupar, _vacio, _verificar_tareas
+import prefiltro
+from instrumento import Instrumento
+from reglas import por_circuito
+
+_TABLAS = ("trafos", "tramos", "usuarios", "curvas")
+_VERSION = 1
+
+
+class EscritorAlmacen:
+    """
+    Escribe un almacén circuito por circuito (sin tener la flota en memoria).
+        agregar(DatosT, DatosL, DatosN, CurTemp) : un circuito, en el formato de Verificar
+    El id del circuito es DatosT[0]. Hay que llamar a `cerrar` (o usarlo con `with`).
+    """
+
+    def __init__(self, directorio: str):
+        os.makedirs(directorio, exist_ok=True)
+        self.directorio = directorio
+        # se reescriben los .bin: soltar el memmap que este proceso tenga abierto
+        _ABIERTOS.pop(os.path.abspath(directorio), None)
+        self._fids = {t: open(os.path.join(directorio, f"{t}.bin"), "wb") for t in _TABLAS}
+        self._columnas = dict.fromkeys(_TABLAS)
+        self._filas = dict.fromkeys(_TABLAS, 0)
+        self._circuitos = []
+        self._offsets = [[0], [0], [0]]
+
+    def _escribir(self, tabla, datos):
+        datos = np.asarray(datos, dtype=np.float64)
+        if datos.ndim == 1:
+            datos = datos[None, :]
+        if datos.shape[0] == 0:
+            return
+        cols = self._columnas[tabla]
+        if cols is None:
+            self._columnas[tabla] = datos.shape[1]
+        elif cols != datos.shape[1]:
+            raise ValueError(f"{tabla}: se esperaban {cols} columnas y llegaron {datos.shape[1]}")
+        self._fids[tabla].write(np.ascontiguousarray(datos).tobytes())
+        self._filas[tabla] += datos.shape[0]
+
+    def agregar(self, DatosT, DatosL, DatosN, CurTemp):
+        DatosT = np.asarray(DatosT, dtype=np.float64).ravel()
+        self._circuitos.append(int(DatosT[0]) if DatosT.size and not np.isnan(DatosT[0]) else -1)
+        self._escribir("trafos", DatosT)
+        for k, (tabla, datos) in enumerate(zip(_TABLAS[1:], (DatosL, DatosN, CurTemp))):
+            self._escribir(tabla, datos)
+            self._offsets[k].append(self._filas[tabla])
+
+    def cerrar(self):
+        if self._fids is None:
+            return
+        for fid in self._fids.values():
+            fid.close()
+        self._fids = None
+        np.save(os.path.join(self.directorio, "circuitos.npy"), np.asarray(self._circuitos, dtype=np.int64))
+        np.save(os.path.join(self.directorio, "offsets.npy"), np.asarray(self._offsets, dtype=np.int64))
+        manifiesto = {
+            "version": _VERSION,
+            "circuitos": len(self._circuitos),
+            "tablas": {t: {"columnas": self._columnas[t] or 0, "filas": self._filas[t]} for t in _TABLAS},
+        }
+        with open(os.path.join(self.directorio, "almacen.json"), "w", encoding="utf-8") as fid:
+            json.dump(manifiesto, fid, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+def desde_tablas(directorio: str, DatosT, DatosL, DatosN, CurTemp, col_circuito: int = 0) -> "Almacen":
+    """Crea un almacén a partir de tablas de flota (mismo formato que VerificarLote)."""
+    DatosT = np.atleast_2d(np.asarray(DatosT, dtype=float))
+    grupos = [_agrupar(t, col_circuito) for t in (DatosL, DatosN, CurTemp)]
+    vacios = [_vacio(t) for t in (DatosL, DatosN, CurTemp)]
+    with EscritorAlmacen(directorio) as esc:
+        for fila in DatosT:
+            circ = int(fila[0]) if not np.isnan(fila[0]) else -1
+            esc.agregar(fila, *(g.get(circ, v) for g, v in zip(grupos, vacios)))
+    return Almacen(directorio)
+
+
+def _version(directorio) -> tuple:
+    # sello del contenido: el manifiesto se escribe último al cerrar cada escritura
+    st = os.stat(os.path.join(directorio, "almacen.json"))
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+class Almacen:
+    """
+    Lector de un almacén. `alm[k]` devuelve (DatosT, DatosL, DatosN, CurTemp) del
+    k-ésimo circuito como vistas sobre los memmap (sin copiar); `alm.circuito(id)`
+    busca por id. Iterar recorre los circuitos en orden de escritura.
+    """
+
+    def __init__(self, directorio: str):
+        self.directorio = directorio
+        self.version = _version(directorio)
+        with open(os.path.join(directorio, "almacen.json"), encoding="utf-8") as fid:
+            man = json.load(fid)
+        if man.get("version") != _VERSION:
+            raise ValueError(f"{directorio}: versión de almacén no soportada ({man.get('version')})")
+        self.circuitos = np.load(os.path.join(directorio, "circuitos.npy"), mmap_mode="r")
+        self.offsets = np.load(os.path.join(directorio, "offsets.npy"))
+        self._datos = {t: self._abrir(t, **man["tablas"][t]) for t in _TABLAS}
+        self._pos = None
+
+    def _abrir(self, tabla, columnas, filas):
+        if filas == 0:
+            # np.memmap no acepta archivos vacíos
+            return np.empty((0, columnas), dtype=np.float64)
+        ruta = os.path.join(self.directorio, f"{tabla}.bin")
+        return np.memmap(ruta, dtype=np.float64, mode="r", shape=(filas, columnas))
+
+    def __len__(self) -> int:
+        return int(self.circuitos.size)
+
+    def __getitem__(self, k: int):
+        o = self.offsets
+        T = self._datos["trafos"][k]
+        L = self._datos["tramos"][o[0, k]:o[0, k + 1]]
+        N = self._datos["usuarios"][o[1, k]:o[1, k + 1]]
+        C = self._datos["curvas"][o[2, k]:o[2, k + 1]]
+        return T, L, N, C
+
+    def __iter__(self):
+        for k in range(len(self)):
+            yield self[k]
+
+    def medidas(self):
+        """Medidas del prefiltro de cada circuito (ver prefiltro.medidas), desde los offsets."""
+        o = self.offsets
+        out = [np.diff(o[k]) * self._datos[t].shape[1] for k, t in enumerate(_TABLAS[1:])]
+        for s in prefiltro._signos(self._datos["curvas"]):
+            acum = np.concatenate([[0], np.cumsum(s)])
+            out.append(acum[o[2, 1:]] - acum[o[2, :-1]])
+        return tuple(out)
+
+    def circuito(self, circ: int):
+        if self._pos is None:
+            self._pos = {c: k for k, c in enumerate(self.circuitos.tolist())}
+        return self[self._pos[int(circ)]]
+
+
+# =======================
+# Verificación desde el almacén
+# =======================
+
+_ABIERTOS = {}   # directorio -> Almacen abierto en este proceso (un memmap por worker)
+
+
+def _abierto(directorio, version) -> Almacen:
+    # el almacén de `directorio` en la versión pedida (si se reescribió, se reabre)
+    alm = _ABIERTOS.get(directorio)
+    if alm is None or alm.version != version:
+        alm = _ABIERTOS[directorio] = Almacen(directorio)
+        if alm.version != version:
+            raise ValueError(f"{directorio}: el almacén cambió durante la verificación")
+    return alm
+
+
+def _verificar_de_almacen(tarea, instrumento=None):
+    # A los workers solo viaja (todos, directorio, versión, k, reglas): cada uno lee su circuito del memmap
+    todos, directorio, version, k, reglas = tarea
+    T, L, N, C = _abierto(directorio, version)[k]
+    return verificar_circuito(T, L, N, C, todos, instrumento, reglas)
+
+
+def VerificarAlmacen(almacen, procesos: int = None, chunksize: int = None, todos: bool = False,
+                     sumidero=None, cache=None, instrumento: Instrumento = None, reglas=None):
+    """
+    Como VerificarLote (incluido el prefiltro con todos=False), pero leyendo los
+    circuitos de un almacén (Almacen o directorio). Devuelve la lista de
+    Resultado en el orden del almacén. Si el almacén se reescribió después de
+    abrir el Almacen recibido, se verifica lo que hay ahora en disco.
+    """
+    if not isinstance(almacen, Almacen) or almacen.version != _version(almacen.directorio):
+        # directorio, o un Almacen abierto antes de reescribirlo: leer lo que hay en disco
+        almacen = Almacen(getattr(almacen, "directorio", almacen))
+    directorio = os.path.abspath(almacen.directorio)
+    _ABIERTOS[directorio] = almacen
+    elegir = por_circuito(reglas)
+    tareas = ((todos, directorio, almacen.version, k, elegir(c))
+              for k, c in enumerate(almacen.circuitos.tolist()))
+    previos = None
+    if not todos and len(almacen):
+        T = almacen._datos["trafos"]
+        previos = prefiltro.resultados(T, prefiltro.codigos(T, *almacen.medidas(), reglas=reglas))
+    return _verificar_tareas(tareas, len(almacen), procesos, chunksize, todos, sumidero, cache,
+                             instrumento, uno=_verificar_de_almacen,
+                             datos=lambda t: almacen[t[3]], previos=previos)
@@ -1,8 +1,10 @@
 import streamlit as st
-import pandas as pd
-import numpy as np
-import io, os, tempfile
-from Verificar import Verificar   # <<--- usa tu Verificar.py
+import os, time, threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from Verificar import verificar_circuito   # <<--- usa tu Verificar.py
+from ingesta import ErrorIngesta, leer_circuito
+from flujo import leer_trafos, verificar_flujo
 
 st.title("Verificación de Circuitos Eléctricos")
 st.write("Sube los 4 archivos CSV para validar el sistema.")
@@ -11,38 +13,137 @@ trafos_file   = st.file_uploader("Trafos.csv",   type=["csv"])
 tramos_file   = st.file_uploader("Tramos.csv",   type=["csv"])
 usuarios_file = st.file_uploader("Usuarios.csv", type=["csv"])
 curvas_file   = st.file_uploader("Curvas.csv",   type=["csv"])
+flota = st.checkbox("Archivos de flota (varios circuitos; id de circuito en la primera columna)")
+
+
+class _Cola:
+    """
+    Pool de procesos compartido por todas las sesiones del servidor.
+    Cada verificación es un trabajo independiente: no se cambia el directorio
+    de trabajo ni se escriben archivos, el informe vuelve en el Resultado.
+    """
+
+    def __init__(self, workers: int):
+        self.ex = ProcessPoolExecutor(max_workers=workers)
+        self._lock = threading.Lock()
+        self._pendientes = []
+
+    def enviar(self, *args):
+        fut = self.ex.submit(verificar_circuito, *args)
+        with self._lock:
+            self._pendientes = [f for f in self._pendientes if not f.done()]
+            self._pendientes.append(fut)
+        return fut
+
+    def posicion(self, fut) -> int:
+        # trabajos en espera antes que `fut` (0 si ya se está ejecutando)
+        with self._lock:
+            antes = []
+            for f in self._pendientes:
+                if f is fut:
+                    break
+                antes.append(f)
+        if fut.running() or fut.done():
+            return 0
+        return sum(1 for f in antes if not (f.running() or f.done()))
+
+
+@st.cache_resource
+def _cola():
+    return _Cola(workers=max(1, (os.cpu_count() or 2) - 1))
+
+
+def _renovar(cola):
+    # si muere un worker (p. ej. sin memoria) el pool queda roto para siempre:
+    # se descarta y el próximo _cola() crea otro (salvo que otra sesión ya lo hizo)
+    if _cola() is cola:
+        _cola.clear()
+    cola.ex.shutdown(wait=False)
+
+
+def _enviar(*args):
+    cola = _cola()
+    try:
+        return cola, cola.enviar(*args)
+    except BrokenProcessPool:
+        _renovar(cola)
+        cola = _cola()
+        return cola, cola.enviar(*args)
 
-def _read_csv(f):
-    b = f.read()
-    return pd.read_csv(io.BytesIO(b))
 
 if st.button("Ejecutar Verificación"):
     if not all([trafos_file, tramos_file, usuarios_file, curvas_file]):
         st.error("Debes subir los 4 archivos.")
         st.stop()
 
-    dfT = _read_csv(trafos_file)
-    dfL = _read_csv(tramos_file)
-    dfN = _read_csv(usuarios_file)
-    dfC = _read_csv(curvas_file)
-
-    DatosT = dfT.select_dtypes(include=["number"]).to_numpy(dtype=float).ravel()
-    DatosL = dfL.select_dtypes(include=["number"]).to_numpy(dtype=float)
-    DatosN = dfN.select_dtypes(include=["number"]).to_numpy(dtype=float)
-    CurTemp = dfC.select_dtypes(include=["number"]).to_numpy(dtype=float)
-
-    with tempfile.TemporaryDirectory() as td:
-        os.chdir(td)
-        if os.path.exists("Informe de errores.txt"):
-            os.remove("Informe de errores.txt")
-
-        # ejecutar tu programa
-        Verificar(DatosT, DatosL, DatosN, CurTemp)
-
-        with open("Informe de errores.txt", "rb") as f:
-            st.download_button(
-                "Descargar Informe",
-                f,
-                file_name="Informe_de_errores.txt",
-                mime="text/plain"
-            )
+    if flota:
+        # se verifica mientras se leen los archivos, con avance en vivo
+        cola = _cola()
+        try:
+            DatosT = leer_trafos(trafos_file)
+            barra = st.progress(0.0, text="Verificando…")
+            total, informe, errores = max(len(DatosT), 1), [], 0
+            flujo = verificar_flujo(DatosT, tramos_file, usuarios_file, curvas_file, ejecutor=cola.ex)
+            for k, res in enumerate(flujo, 1):
+                informe.extend(res.lineas())
+                errores += res.codigo != 0
+                barra.progress(k / total, text=f"{k}/{total} circuitos, {errores} con errores")
+        except ErrorIngesta as exc:
+            st.error(str(exc))
+            st.stop()
+        except BrokenProcessPool:
+            _renovar(cola)
+            st.error("Un proceso de verificación terminó inesperadamente. Vuelve a ejecutar la verificación.")
+            st.stop()
+        st.session_state.pop("trabajo", None)
+        st.session_state["flota"] = ("".join(informe), len(DatosT), errores)
+        st.rerun()
+
+    try:
+        DatosT, DatosL, DatosN, CurTemp = leer_circuito(trafos_file, tramos_file, usuarios_file, curvas_file)
+    except ErrorIngesta as exc:
+        st.error(str(exc))
+        st.stop()
+
+    # ejecutar tu programa en el pool compartido (no bloquea a otras sesiones)
+    st.session_state.pop("flota", None)
+    st.session_state["cola"], st.session_state["trabajo"] = _enviar(DatosT, DatosL, DatosN, CurTemp)
+    st.session_state["inicio"] = time.time()
+
+if "flota" in st.session_state:
+    texto, n, errores = st.session_state["flota"]
+    st.success(f"{n} circuitos verificados, {errores} con errores")
+    st.download_button(
+        "Descargar Informe",
+        texto.encode("utf-8"),
+        file_name="Informe_de_errores.txt",
+        mime="text/plain"
+    )
+
+fut = st.session_state.get("trabajo")
+if fut is not None:
+    if not fut.done():
+        pos = st.session_state["cola"].posicion(fut)
+        seg = time.time() - st.session_state.get("inicio", time.time())
+        if pos:
+            st.info(f"En cola: {pos} verificación(es) antes de la tuya…")
+        else:
+            st.info(f"Verificando… ({seg:.0f} s)")
+        time.sleep(0.5)
+        st.rerun()
+    elif fut.exception() is not None:
+        if isinstance(fut.exception(), BrokenProcessPool):
+            _renovar(st.session_state["cola"])
+        st.error(f"La verificación falló: {fut.exception()}")
+    else:
+        res = fut.result()
+        if res.codigo == 0:
+            st.success(f"Circuito {res.circuito}: circuito normal")
+        else:
+            st.warning(f"Circuito {res.circuito}: error {res.codigo}")
+        st.download_button(
+            "Descargar Informe",
+            "".join(res.lineas()).encode("utf-8"),
+            file_name="Informe_de_errores.txt",
+            mime="text/plain"
+        )
@@ -0,0 +1,239 @@
+# bench/bench_verificar.py
+# Benchmark de Verificar sobre circuitos sintéticos (bench/sintetico.py).
+#
+#   python -m bench.bench_verificar                      # tiempos y memoria por etapa
+#   python -m bench.bench_verificar --tamanos 1e3 1e6 --formas hub --salida bench.json
+#   python -m bench.bench_verificar --equivalencia 2000  # contra el Verificar original
+#                                                        # (requiere networkx: requirements-dev.txt)
+#   python -m bench.bench_verificar --flujo 200          # verificar_flujo contra VerificarLote
+#
+# Etapas: construcción del grafo, BFS y biconexas (propiedades de _Analisis) y
+# los grupos de checks en el orden de _CHECKS. La memoria es el pico de
+# tracemalloc de cada etapa, medido en una segunda pasada (tracemalloc frena).
+
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+import Verificar as V
+from flujo import verificar_flujo
+from informe import SumideroMemoria
+from ingesta import ErrorIngesta
+from lote import VerificarLote
+from bench import sintetico
+
+# Intermedios de _Analisis que se miden por separado (en orden de dependencia)
+_ETAPAS_ANALISIS = (
+    ("grafo", lambda a: a.G),
+    ("bfs", lambda a: a.arbol),
+    ("biconexas", lambda a: a.biconexas),
+)
+
+# Grupos de checks (mismos bloques que en Verificar.py)
+_GRUPOS = (
+    ("datos", (35, 36, 37, 2, 3, 4, 1)),
+    ("tramos", (8, 9, 11, 13, 29)),
+    ("usuarios", (14, 15, 34, 33, 16, 18, 19, 20, 27)),
+    ("topologia", (22, 26, 24)),
+    ("faseo", (25, 23, 30, 31)),
+)
+
+
+def _etapas(c):
+    # (nombre, función) en orden; todas corren sobre el mismo _Analisis
+    checks = dict(V._CHECKS)
+    out = [(nombre, f) for nombre, f in _ETAPAS_ANALISIS]
+    for nombre, codigos in _GRUPOS:
+        fs = [checks[k] for k in codigos]
+        out.append((nombre, lambda a, fs=fs: [f(a) for f in fs]))
+    return out
+
+
+def medir(c, repeticiones: int = 3) -> dict:
+    """Tiempo (mejor de `repeticiones`, en s) y pico de memoria (bytes) por etapa."""
+    etapas = _etapas(c)
+    tiempos = {nombre: float("inf") for nombre, _ in etapas}
+    total = float("inf")
+    for _ in range(repeticiones):
+        a = V._Analisis(*c.args)
+        t_ini = time.perf_counter()
+        for nombre, f in etapas:
+            t0 = time.perf_counter()
+            f(a)
+            tiempos[nombre] = min(tiempos[nombre], time.perf_counter() - t0)
+        total = min(total, time.perf_counter() - t_ini)
+
+    memoria = {}
+    a = V._Analisis(*c.args)
+    tracemalloc.start()
+    try:
+        for nombre, f in etapas:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+            f(a)
+            memoria[nombre] = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+    t0 = time.perf_counter()
+    codigo = V.verificar_circuito(*c.args).codigo
+    return {
+        "codigo": codigo,
+        "verificar_s": time.perf_counter() - t0,
+        "total_s": total,
+        "tiempo_s": tiempos,
+        "memoria_bytes": memoria,
+    }
+
+
+def benchmark(tamanos, formas, repeticiones: int = 3, seed: int = 0, salida=sys.stderr) -> dict:
+    resultados = []
+    for forma in formas:
+        for n in tamanos:
+            c = sintetico.generar(n, forma, seed=seed)
+            r = medir(c, repeticiones)
+            r.update(forma=forma, nodos=len(c.ids), tramos=len(c.DatosL), usuarios=len(c.DatosN))
+            resultados.append(r)
+            print(f"{forma:>7} n={len(c.ids):>8}  {r['total_s'] * 1e3:10.2f} ms  "
+                  f"pico={max(r['memoria_bytes'].values()) / 2**20:8.1f} MiB  error={r['codigo']}",
+                  file=salida)
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "maquina": platform.machine(),
+        "resultados": resultados,
+    }
+
+
+def equivalencia(casos: int, seed: int = 0, n_max: int = 200, salida=sys.stderr) -> int:
+    """
+    Compara código e informe de texto del Verificar actual con la copia del
+    original (bench/referencia.py) sobre `casos` circuitos aleatorios.
+    Devuelve la cantidad de diferencias. La referencia usa networkx (no es
+    dependencia de Verificar, ver requirements-dev.txt): sin él lanza ImportError.
+    """
+    from bench import referencia
+
+    rng = np.random.default_rng(seed)
+    difs = 0
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)   # el original escribe 'Informe de errores.txt' en el directorio actual
+        try:
+            for k in range(casos):
+                c = sintetico.aleatorio(rng, n_max)
+                err_ref, _ = referencia.Verificar(*[x.copy() for x in c.args])
+                with open("Informe de errores.txt", encoding="utf-8", newline="") as fid:
+                    txt_ref = fid.read()
+                os.remove("Informe de errores.txt")
+
+                s = SumideroMemoria()
+                res, _ = V.Verificar(*c.args, sumidero=s, resultado=True)
+                txt = "".join(res.lineas())
+                if err_ref != res.codigo or txt_ref != txt:
+                    difs += 1
+                    print(f"caso {k} ({c.forma}, n={len(c.ids)}): original {err_ref}, actual {res.codigo}",
+                          file=salida)
+        finally:
+            os.chdir(cwd)
+    print(f"equivalencia: {casos - difs}/{casos} casos iguales", file=salida)
+    return difs
+
+
+def _csv(m) -> io.StringIO:
+    # matriz -> CSV con encabezados posicionales (vacío = NaN)
+    lineas = [",".join(f"c{j}" for j in range(m.shape[1]))]
+    lineas += [",".join("" if np.isnan(v) else repr(float(v)) for v in fila) for fila in m.tolist()]
+    return io.StringIO("\n".join(lineas) + "\n")
+
+
+def flujo(casos: int, seed: int = 0, salida=sys.stderr) -> int:
+    """
+    Compara verificar_flujo (CSV leídos por bloques) con VerificarLote sobre
+    `casos` flotas aleatorias: agrupadas en el orden de Trafos (algunos
+    circuitos sin trafo, que se descartan) deben dar lo mismo; con dos grupos
+    de una tabla intercambiados (p. ej. el último adelante) deben rechazarse.
+    Devuelve la cantidad de diferencias.
+    """
+    rng = np.random.default_rng(seed)
+    difs = 0
+    for k in range(casos):
+        cs = [sintetico.generar(int(rng.integers(4, 40)), str(rng.choice(sintetico.FORMAS)),
+                                seed=int(rng.integers(2**31)), tipo=int(rng.choice([1, 3])))
+              for _ in range(int(rng.integers(2, 7)))]
+        grupos = [[np.column_stack([np.full(len(t), c.DatosT[0]), t]) for t in (c.DatosL, c.DatosN, c.CurTemp)]
+                  for c in cs]
+        T = np.vstack([c.DatosT for c in cs])
+        T = T[rng.random(len(T)) > 0.2]   # circuitos sin trafo
+        desordenar = len(T) >= 2 and rng.random() < 0.5
+        if desordenar:
+            # dos circuitos con trafo intercambiados en una tabla
+            con_trafo = [i for i, c in enumerate(cs) if c.DatosT[0] in T[:, 0]]
+            i, j = sorted(rng.choice(con_trafo, 2, replace=False).tolist())
+            t = int(rng.integers(3))
+            grupos[i][t], grupos[j][t] = grupos[j][t], grupos[i][t]
+        tablas = [np.vstack([g[t] for g in grupos]) for t in range(3)]
+        filas = int(rng.integers(3, 60))
+        try:
+            obtenido = [r.a_dict() for r in verificar_flujo(_csv(T), *map(_csv, tablas), filas=filas)]
+        except ErrorIngesta as exc:
+            obtenido = str(exc)
+        if desordenar:
+            ok = isinstance(obtenido, str) and "no sigue el orden de Trafos" in obtenido
+            esperado = "ErrorIngesta (no sigue el orden de Trafos)"
+        else:
+            esperado = [r.a_dict() for r in VerificarLote(T, *tablas, procesos=0)]
+            ok = obtenido == esperado
+        if not ok:
+            difs += 1
+            print(f"flota {k} ({len(cs)} circuitos, {len(T)} con trafo, bloques de {filas}): "
+                  f"esperado {esperado}, obtenido {obtenido}", file=salida)
+    print(f"flujo: {casos - difs}/{casos} flotas iguales", file=salida)
+    return difs
+
+
+def main(argv=None):
+    p = argparse.ArgumentParser(description="Benchmark de Verificar sobre circuitos sintéticos")
+    p.add_argument("--tamanos", nargs="+", type=float, default=[10, 100, 1e3, 1e4, 1e5],
+                   help="cantidad de nodos (hasta 1e6)")
+    p.add_argument("--formas", nargs="+", choices=sintetico.FORMAS, default=list(sintetico.FORMAS))
+    p.add_argument("--repeticiones", type=int, default=3)
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--salida", help="archivo JSON (por defecto, stdout)")
+    p.add_argument("--equivalencia", type=int, metavar="N",
+                   help="en lugar del benchmark, comparar N circuitos aleatorios con el original")
+    p.add_argument("--flujo", type=int, metavar="N",
+                   help="en lugar del benchmark, comparar verificar_flujo con VerificarLote en N flotas")
+    args = p.parse_args(argv)
+
+    if args.equivalencia:
+        try:
+            difs = equivalencia(args.equivalencia, args.seed)
+        except ImportError as exc:
+            # sin referencia no hay comparación: no puede terminar como si todo coincidiera
+            print(f"equivalencia no ejecutada: {exc} (pip install -r requirements-dev.txt)", file=sys.stderr)
+            return 2
+        return 1 if difs else 0
+    if args.flujo:
+        return 1 if flujo(args.flujo, args.seed) else 0
+
+    datos = benchmark([int(n) for n in args.tamanos], args.formas, args.repeticiones, args.seed)
+    texto = json.dumps(datos, indent=2)
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as fid:
+            fid.write(texto)
+    else:
+        print(texto)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,320 @@
+# bench/sintetico.py
+# Generador de circuitos sintéticos en los formatos de Verificar
+# (DatosT, DatosL, DatosN, CurTemp), válidos o con un error inyectado.
+#   radial : árbol con faseo descendente (7 -> 4/5/6 -> 1/2/3)
+#   anillo : árbol + tramos que cierran anillos (enmallado)
+#   hub    : nodo concentrador con muchos tramos salientes y anillo entre ellos
+
+from dataclasses import dataclass, replace
+
+import numpy as np
+
+from Verificar import COMP_TT
+
+FORMAS = ("radial", "anillo", "hub")
+
+# Códigos que `inyectar` sabe provocar
+CODIGOS = (35, 36, 37, 2, 3, 4, 1, 8, 9, 11, 13, 29, 14, 15, 34, 33, 16, 18, 19, 20, 27,
+           22, 26, 24, 25, 23, 30, 31)
+
+# Faseos hijos permitidos para un tramo que cuelga de otro (trifásico / monofásico)
+_HIJOS_TRI = {7: (7, 4, 5, 6), 4: (4, 1, 2), 5: (5, 2, 3), 6: (6, 1, 3), 1: (1,), 2: (2,), 3: (3,)}
+_HIJOS_MONO = {4: (4, 1, 2), 1: (1,), 2: (2,)}
+# Fases de usuario compatibles con el tramo que alimenta su nodo
+_USUARIO = {1: (1,), 2: (2,), 3: (3,), 4: (1, 2, 4), 5: (2, 3, 5), 6: (1, 3, 6), 7: (1, 2, 3, 4, 5, 6, 7)}
+
+
+@dataclass
+class Circuito:
+    DatosT: np.ndarray
+    DatosL: np.ndarray
+    DatosN: np.ndarray
+    CurTemp: np.ndarray
+    forma: str
+    ids: np.ndarray          # id de cada nodo (índice 0 = slack)
+    padre: np.ndarray        # padre de cada nodo en el árbol base (-1 = slack)
+    fila_in: np.ndarray      # fila de DatosL del tramo padre -> nodo (-1 = slack)
+    cierre: np.ndarray       # filas de DatosL de los tramos que cierran anillos
+    cierre_nodo: np.ndarray  # nodo mayor de cada tramo de cierre (su tramo padre está en el mismo anillo)
+
+    @property
+    def args(self):
+        return self.DatosT, self.DatosL, self.DatosN, self.CurTemp
+
+
+def _arbol(rng, n, ventana):
+    # padre[i] < i; `ventana` pequeña -> ramales largos, grande -> árbol frondoso
+    i = np.arange(1, n)
+    padre = np.empty(n, dtype=np.int64)
+    padre[0] = -1
+    padre[1:] = rng.integers(np.maximum(0, i - ventana), i)
+    return padre
+
+
+def _fases_descendentes(rng, padre, raiz):
+    # fase del tramo entrante de cada nodo, eligiendo entre los hijos permitidos del padre
+    hijos = _HIJOS_TRI if raiz == 7 else _HIJOS_MONO
+    fase = np.zeros(padre.size, dtype=np.int64)
+    sorteo = rng.random(padre.size)
+    padre_l, fase_l, sorteo_l = padre.tolist(), fase.tolist(), sorteo.tolist()
+    for v in range(1, padre.size):
+        p = padre_l[v]
+        op = hijos[fase_l[p]] if p > 0 else (raiz,)
+        # se favorece seguir con la misma fase para tener ramales largos
+        fase_l[v] = op[0] if sorteo_l[v] < 0.7 else op[int(sorteo_l[v] * 1e6) % len(op)]
+    return np.asarray(fase_l, dtype=np.int64)
+
+
+def generar(n: int, forma: str = "radial", seed=None, tipo: int = 3, usuarios_por_nodo: float = 1.0,
+            horas: int = 24) -> Circuito:
+    """Circuito válido (Verificar devuelve 0) de `n` nodos."""
+    if forma not in FORMAS:
+        raise ValueError(f"forma desconocida: {forma}")
+    n = max(int(n), 4)
+    rng = np.random.default_rng(seed)
+    ids = 1_000_000 + rng.permutation(50 * n)[:n].astype(np.int64)
+
+    if forma == "hub":
+        # slack -> hub -> radios; los radios se unen en anillo de a pares
+        padre = np.zeros(n, dtype=np.int64)
+        padre[0] = -1
+        radios = max(n // 2, 2)
+        padre[2:radios + 2] = 1
+        padre[radios + 2:] = _arbol(rng, n, 8)[radios + 2:]
+    else:
+        padre = _arbol(rng, n, 4 if forma == "radial" else 64)
+
+    raiz = 7 if tipo == 3 else 4
+    fase_in = _fases_descendentes(rng, padre, raiz)
+
+    extra = np.empty((0, 2), dtype=np.int64)
+    if forma == "anillo":
+        # cada tramo extra une un nodo con otro cercano en numeración (cierra un anillo)
+        k = max(n // 10, 1)
+        a = rng.integers(1, n, k)
+        b = np.maximum(0, a - rng.integers(2, 16, k))
+        extra = np.unique(np.sort(np.stack([a, b], 1), axis=1), axis=0)
+        extra = extra[(extra[:, 0] != extra[:, 1]) & (padre[extra[:, 1]] != extra[:, 0])
+                      & (padre[extra[:, 0]] != extra[:, 1])]
+    elif forma == "hub":
+        r = np.arange(2, radios + 1)
+        extra = np.stack([r, r + 1], 1)
+
+    v = np.arange(1, n)
+    aristas = np.concatenate([np.stack([padre[v], v], 1), extra])
+    fases = np.concatenate([fase_in[v], np.full(len(extra), raiz)])
+    fila_in = np.full(n, -1, dtype=np.int64)
+    fila_in[1:] = np.arange(n - 1)
+
+    cierre = np.arange(n - 1, len(aristas))
+    cierre_nodo = extra[:, 1].astype(np.int64)
+    if extra.size:
+        # los anillos van con faseo completo para que ningún par en la malla choque:
+        # todos los tramos que no son hoja (o que tocan un cierre) pasan a la fase de la raíz
+        interno = np.zeros(n, dtype=bool)
+        interno[padre[1:]] = True
+        interno[extra.ravel()] = True
+        interno = interno[v]
+        fases[:n - 1][interno] = raiz
+        fase_in[1:][interno] = raiz
+
+    m = len(aristas)
+    DatosL = np.zeros((m, 9))
+    DatosL[:, :2] = ids[aristas]
+    DatosL[:, 2] = fases
+    DatosL[:, 3] = rng.uniform(5, 60, m)          # longitud
+    DatosL[:, 4] = rng.integers(1, 3, m)          # montaje
+    DatosL[:, 5] = rng.integers(1, 5, m)
+    DatosL[:, 6] = rng.integers(1, 3, m)          # material fase
+    DatosL[:, 7] = rng.integers(1, 5, m)
+    DatosL[:, 8] = rng.integers(1, 3, m)          # material neutro
+    orden = rng.permutation(m)
+    DatosL = DatosL[orden]
+    pos = np.empty(m, dtype=np.int64)
+    pos[orden] = np.arange(m)
+    fila_in[1:] = pos[fila_in[1:]]
+    cierre = pos[cierre]
+
+    # usuarios en nodos no-slack, con fase compatible con el tramo entrante
+    nu = max(int(n * usuarios_por_nodo), 2)
+    nodo_u = rng.integers(1, n, nu)
+    f_in = fase_in[nodo_u]
+    sorteo = rng.integers(0, 7, nu)
+    fase_u = np.array([_USUARIO[f][s % len(_USUARIO[f])] for f, s in zip(f_in.tolist(), sorteo.tolist())])
+    if np.unique(fase_u).size == 1:
+        # evitar el error 27 (todos en la misma fase)
+        nodo_u[0] = 0
+        fase_u[0] = 2 if fase_u[0] != 2 else 1
+    DatosN = np.zeros((nu, 7))
+    DatosN[:, 0] = ids[nodo_u]
+    DatosN[:, 1] = fase_u
+    DatosN[:, 2] = rng.uniform(50, 400, nu)
+    DatosN[:, 3] = rng.uniform(0, 1, nu)
+    DatosN[:, 4] = rng.integers(1, 3, nu)         # medidor
+    DatosN[:, 5] = rng.integers(0, 7, nu)         # estrato
+    DatosN[:, 6] = rng.integers(1, 12, nu)        # clase
+
+    topo = 0 if extra.size else 1
+    DatosT = np.array([ids[0], 75.0, tipo, 13200.0, 220.0, topo])
+    CurTemp = rng.uniform(0.2, 1.0, (horas, 1))
+    return Circuito(DatosT, DatosL, DatosN, CurTemp, forma, ids, padre, fila_in, cierre, cierre_nodo)
+
+
+def inyectar(c: Circuito, codigo: int, seed=None) -> Circuito:
+    """
+    Copia de `c` con el error `codigo` provocado. Verificar debe reportar ese
+    código (los checks anteriores en el orden de Verificar siguen pasando).
+    """
+    rng = np.random.default_rng(seed)
+    T, L, N, C = c.DatosT.copy(), c.DatosL.copy(), c.DatosN.copy(), c.CurTemp.copy()
+    slack = T[0]
+    tipo = int(T[2])
+    vacioL, vacioN = np.empty((0, L.shape[1])), np.empty((0, N.shape[1]))
+    nuevo = float(c.ids.max() + 1)
+    i = int(rng.integers(len(L)))
+    j = int(rng.integers(len(N)))
+
+    if codigo == 35:
+        L, N = vacioL, vacioN
+    elif codigo == 36:
+        C[:] = 0
+    elif codigo == 37:
+        C = np.empty((0, C.shape[1]))
+    elif codigo == 2:
+        T[2] = 2
+    elif codigo == 3:
+        T[3] = T[4]
+    elif codigo == 4:
+        T[5] = 2
+    elif codigo == 1:
+        T[0] = nuevo
+    elif codigo == 8:
+        L[i, 2] = 9 if tipo == 3 else 3
+    elif codigo == 9:
+        L[i, 4] = 3
+    elif codigo == 11:
+        L[i, 6] = 0
+    elif codigo == 13:
+        L[i, 8] = 5
+    elif codigo == 29:
+        L[i, 1] = L[i, 0]
+    elif codigo == 14:
+        N[j, 0] = nuevo
+    elif codigo == 15:
+        L, N[:, 0] = vacioL, slack
+    elif codigo == 34:
+        N[:, 0] = slack
+    elif codigo == 33:
+        L = vacioL
+    elif codigo == 16:
+        N[j, 1] = 9 if tipo == 3 else 3
+    elif codigo == 18:
+        N[j, 4] = 3
+    elif codigo == 19:
+        N[j, 5] = 9
+    elif codigo == 20:
+        N[j, 6] = 0
+    elif codigo == 27:
+        T[5] = 1
+        N[:, 1] = 1
+    elif codigo == 22:
+        L = np.vstack([L, L[i]])
+        L[-1, :2] = (nuevo, nuevo + 1)
+    elif codigo == 24:
+        T[5] = 1
+        if not c.cierre.size:
+            # cerrar un anillo en un árbol radial
+            v = _con_abuelo(c, codigo)
+            L = np.vstack([L, L[c.fila_in[v]]])
+            L[-1, :2] = (c.ids[c.padre[c.padre[v]]], c.ids[v])
+    elif codigo == 26:
+        T[5] = 0
+        L = np.delete(L, c.cierre, axis=0)
+    elif codigo == 25:
+        # nodo con abuelo: tramo del padre y tramo propio incompatibles (1 -> 2)
+        _radial(c, codigo)
+        v = _con_abuelo(c, codigo)
+        L[c.fila_in[c.padre[v]], 2] = 1
+        L[c.fila_in[v], 2] = 2
+    elif codigo == 23:
+        # hoja cuyo tramo pasa a fase f (compatible con el del padre) y usuario en fase g
+        _radial(c, codigo)
+        hoja = _hojas(c)
+        p = c.padre
+        f_p = np.where(p > 0, c.DatosL[c.fila_in[np.maximum(p, 0)], 2], 7)
+        for f, g in ((1, 2), (2, 1)):
+            ok = np.flatnonzero(hoja & ((p == 0) | COMP_TT[f_p.astype(int), f]))
+            if ok.size:
+                break
+        else:
+            raise ValueError("no hay hoja donde provocar el error 23")
+        v = int(ok[0])
+        L[c.fila_in[v], 2] = f
+        N = np.vstack([N, N[j]])
+        N[-1, :2] = (c.ids[v], g)
+    elif codigo == 30:
+        # tramo de cierre y tramo padre de su nodo mayor (mismo anillo) con fases 1 y 2
+        if not c.cierre.size:
+            raise ValueError("el error 30 requiere un circuito enmallado")
+        L[c.cierre[0], 2] = 1
+        L[c.fila_in[c.cierre_nodo[0]], 2] = 2
+    elif codigo == 31:
+        # hoja fuera de los anillos (tramo puente) en fase 1 con un usuario en fase 2
+        if not c.cierre.size:
+            raise ValueError("el error 31 requiere un circuito enmallado")
+        hoja = _hojas(c)
+        hoja[_en_cierre(c)] = False
+        ok = np.flatnonzero(hoja)
+        if not ok.size:
+            raise ValueError("no hay hoja donde provocar el error 31")
+        v = int(ok[0])
+        L[c.fila_in[v], 2] = 1
+        N = np.vstack([N, N[j]])
+        N[-1, :2] = (c.ids[v], 2)
+    else:
+        raise ValueError(f"código no soportado: {codigo}")
+    return replace(c, DatosT=T, DatosL=L, DatosN=N, CurTemp=C)
+
+
+def _hojas(c: Circuito) -> np.ndarray:
+    hoja = np.ones(len(c.ids), dtype=bool)
+    hoja[c.padre[c.padre >= 0]] = False
+    hoja[0] = False
+    return hoja
+
+
+def _en_cierre(c: Circuito) -> np.ndarray:
+    # índices de nodo que son extremo de algún tramo de cierre
+    pos = {int(x): k for k, x in enumerate(c.ids.tolist())}
+    ext = c.DatosL[c.cierre, :2].astype(np.int64).ravel().tolist()
+    return np.array([pos[x] for x in ext], dtype=np.int64)
+
+
+def _con_abuelo(c: Circuito, codigo: int) -> int:
+    v = np.flatnonzero(c.padre > 0)
+    if not v.size:
+        raise ValueError(f"el error {codigo} requiere un nodo a dos tramos del slack")
+    return int(v[0])
+
+
+def _radial(c: Circuito, codigo: int):
+    if c.cierre.size:
+        raise ValueError(f"el error {codigo} requiere un circuito radial")
+
+
+def aleatorio(rng, n_max: int = 200) -> Circuito:
+    """Circuito de forma, tamaño y error (o ninguno) al azar, para pruebas de equivalencia."""
+    forma = FORMAS[int(rng.integers(len(FORMAS)))]
+    tipo = 3 if rng.random() < 0.8 else 1
+    c = generar(int(rng.integers(4, n_max)), forma, seed=int(rng.integers(2**31)), tipo=tipo,
+                usuarios_por_nodo=float(rng.uniform(0.3, 2.0)))
+    if rng.random() < 0.6:
+        try:
+            c = inyectar(c, int(rng.choice(CODIGOS)), seed=int(rng.integers(2**31)))
+        except ValueError:
+            pass  # el código no aplica a esta forma: queda el circuito válido
+    if rng.random() < 0.05:
+        # sin usuarios, en las formas vacías que llegan de lote/servicio/CSV con solo encabezado
+        vacias = (np.empty((0, 0)), np.array([]), c.DatosN[:0])
+        c = replace(c, DatosN=vacias[int(rng.integers(len(vacias)))])
+    return c
@@ -0,0 +1,144 @@
+# cache.py
+# Caché persistente de resultados para re-verificación incremental.
+# La clave es un hash del contenido del circuito (DatosT/DatosL/DatosN/CurTemp)
+# y de las reglas con que se verificó (ver reglas.py); si las reglas base
+# cambian, el caché se vacía solo al abrirlo. Se guarda en SQLite con
+# expulsión por tamaño (primero lo usado hace más tiempo).
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from informe import Resultado
+from reglas import BASE, Reglas
+
+_LOTE_USOS = 1000   # aciertos acumulados antes de escribir sus marcas de uso
+
+
+def version_reglas() -> str:
+    """Hash de las reglas base que usa Verificar."""
+    return BASE.huella
+
+
+def _hash_arreglo(h, a):
+    a = np.ascontiguousarray(a)
+    h.update(f"{a.dtype.str}{a.shape}".encode())
+    h.update(a.tobytes() if a.size == 0 else memoryview(a).cast("B"))
+
+
+class CacheResultados:
+    """
+    Caché de Resultados en SQLite.
+        ruta      : archivo de la base
+        max_bytes : tamaño máximo de los resultados guardados
+    Lleva la cuenta de aciertos (`hits`) y fallos (`misses`). Las marcas de uso
+    de los aciertos se escriben por lotes (en `guardar_varios`, cada _LOTE_USOS
+    aciertos y al cerrar), cada lote en su propia transacción: las lecturas no
+    dejan la base bloqueada para otros procesos.
+    """
+
+    def __init__(self, ruta: str = "verificar_cache.sqlite", max_bytes: int = 256 * 2**20):
+        self.ruta = ruta
+        self.max_bytes = int(max_bytes)
+        self.hits = 0
+        self.misses = 0
+        self.version = version_reglas()
+        self._lock = threading.Lock()
+        self._usados = []   # (usado, clave) de aciertos aún no escritos
+        self._db = sqlite3.connect(ruta, check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS meta (clave TEXT PRIMARY KEY, valor TEXT);
+            CREATE TABLE IF NOT EXISTS resultados (
+                clave TEXT PRIMARY KEY, datos BLOB NOT NULL,
+                tamano INTEGER NOT NULL, usado REAL NOT NULL);
+            CREATE INDEX IF NOT EXISTS resultados_usado ON resultados (usado);
+        """)
+        fila = self._db.execute("SELECT valor FROM meta WHERE clave = 'version'").fetchone()
+        if fila is None or fila[0] != self.version:
+            # reglas distintas: ningún resultado guardado es válido
+            with self._db:
+                self._db.execute("DELETE FROM resultados")
+                self._db.execute("INSERT OR REPLACE INTO meta VALUES ('version', ?)", (self.version,))
+
+    def clave(self, DatosT, DatosL, DatosN, CurTemp, todos: bool = False, reglas: Reglas = None) -> str:
+        h = hashlib.blake2b(digest_size=20)
+        version = self.version if reglas is None else reglas.huella
+        h.update(f"{version}|{int(bool(todos))}".encode())
+        for a in (DatosT, DatosL, DatosN, CurTemp):
+            _hash_arreglo(h, a)
+        return h.hexdigest()
+
+    def obtener(self, clave: str):
+        """Resultado guardado para `clave` o None."""
+        with self._lock:
+            fila = self._db.execute("SELECT datos FROM resultados WHERE clave = ?", (clave,)).fetchone()
+            if fila is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._usados.append((time.time(), clave))
+            if len(self._usados) >= _LOTE_USOS:
+                with self._db:
+                    self._registrar_usos()
+        return Resultado.desde_dict(json.loads(fila[0]))
+
+    def guardar(self, clave: str, res: Resultado):
+        self.guardar_varios([(clave, res)])
+
+    def guardar_varios(self, pares):
+        """Guarda los pares (clave, Resultado) y las marcas de uso pendientes."""
+        filas = []
+        ahora = time.time()
+        for clave, res in pares:
+            datos = json.dumps(res.a_dict(), ensure_ascii=False).encode("utf-8")
+            filas.append((clave, datos, len(datos), ahora))
+        with self._lock:
+            if not (filas or self._usados):
+                return
+            with self._db:
+                self._registrar_usos()
+                if filas:
+                    self._db.executemany("INSERT OR REPLACE INTO resultados VALUES (?, ?, ?, ?)", filas)
+                    self._expulsar()
+
+    def _registrar_usos(self):
+        # dentro de una transacción y con el lock tomado
+        if self._usados:
+            self._db.executemany("UPDATE resultados SET usado = ? WHERE clave = ?", self._usados)
+            self._usados = []
+
+    def _expulsar(self):
+        total = self._db.execute("SELECT COALESCE(SUM(tamano), 0) FROM resultados").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # borrar los menos usados recientemente hasta quedar bajo el límite
+        sobra = total - self.max_bytes
+        borrar = []
+        for clave, tamano in self._db.execute("SELECT clave, tamano FROM resultados ORDER BY usado"):
+            borrar.append((clave,))
+            sobra -= tamano
+            if sobra <= 0:
+                break
+        self._db.executemany("DELETE FROM resultados WHERE clave = ?", borrar)
+
+    def estadisticas(self) -> dict:
+        with self._lock:
+            n, total = self._db.execute("SELECT COUNT(*), COALESCE(SUM(tamano), 0) FROM resultados").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entradas": n, "bytes": total}
+
+    def cerrar(self):
+        with self._lock:
+            with self._db:
+                self._registrar_usos()
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
@@ -0,0 +1,183 @@
+# cli.py
+# Verificación sin Streamlit, para scripts y ETL.
+#
+#   python cli.py circuitos DIR [DIR ...]          # un circuito por directorio (los 4 CSV)
+#   python cli.py circuitos --lista lote.txt       # un directorio por línea
+#   python cli.py flota DIR                        # 4 CSV de flota, verificados en flujo
+#   python cli.py servir --puerto 8765             # servicio HTTP local (ver servicio.py)
+#
+# Los resultados van a --salida (.jsonl, .csv, .txt o .parquet; '-' = JSONL por
+# stdout). Salida 0 si todo se pudo leer, 2 si algún directorio tuvo error de
+# ingesta o no se pudo usar --reglas/--salida (p. ej. .parquet sin pyarrow). pandas, numpy y Verificar se importan recién al verificar, así
+# `--help` y los errores de uso no pagan esas importaciones.
+
+import argparse
+import json
+import os
+import sys
+
+import informe   # solo biblioteca estándar
+
+ARCHIVOS = ("Trafos.csv", "Tramos.csv", "Usuarios.csv", "Curvas.csv")
+
+
+def _rutas(directorio: str):
+    return [os.path.join(directorio, a) for a in ARCHIVOS]
+
+
+def verificar_directorio(directorio: str, todos: bool = False, reglas=None):
+    """Lee los 4 CSV de `directorio` y devuelve el Resultado del circuito."""
+    from ingesta import leer_circuito
+    from Verificar import verificar_circuito
+
+    return verificar_circuito(*leer_circuito(*_rutas(directorio)), todos=todos, reglas=reglas)
+
+
+def _verificar_o_error(tarea):
+    # (directorio, todos, reglas) -> (Resultado, None) o (None, mensaje); corre en los workers
+    directorio, todos, reglas = tarea
+    from ingesta import ErrorIngesta
+    try:
+        return verificar_directorio(directorio, todos, reglas), None
+    except (ErrorIngesta, OSError) as exc:
+        return None, f"{directorio}: {exc}"
+
+
+class SumideroStdout(informe.Sumidero):
+    """Un objeto JSON por línea en stdout, sin buffer (para encadenar con otros procesos)."""
+
+    def __init__(self):
+        super().__init__(buffer=1)
+
+    def _volcar(self, resultados):
+        sys.stdout.write("".join(json.dumps(r.a_dict(), ensure_ascii=False) + "\n" for r in resultados))
+        sys.stdout.flush()
+
+
+def abrir_sumidero(salida: str):
+    """Sumidero según la extensión de `salida` ('-' = JSONL por stdout)."""
+    if salida == "-":
+        return SumideroStdout()
+    ext = os.path.splitext(salida)[1].lower()
+    if ext == ".csv":
+        return informe.SumideroCSV(salida)
+    if ext == ".txt":
+        return informe.SumideroTexto(salida)
+    if ext == ".parquet":
+        return informe.SumideroParquet(salida)
+    return informe.SumideroJSONL(salida)
+
+
+def _directorios(args):
+    dirs = list(args.directorios)
+    if args.lista:
+        with open(args.lista, encoding="utf-8") as fid:
+            dirs += [l.strip() for l in fid if l.strip() and not l.lstrip().startswith("#")]
+    return dirs
+
+
+def _reglas(args):
+    # Reglas de --reglas (None = reglas base); un archivo inválido corta con ValueError/OSError
+    if not args.reglas:
+        return None
+    from reglas import cargar
+    return cargar(args.reglas)
+
+
+def cmd_circuitos(args) -> int:
+    dirs = _directorios(args)
+    if not dirs:
+        print("no se indicó ningún directorio", file=sys.stderr)
+        return 2
+    try:
+        reglas = _reglas(args)
+        sumidero = abrir_sumidero(args.salida)
+    except (ValueError, OSError, ImportError) as exc:
+        # reglas inválidas o salida que no se puede abrir (p. ej. .parquet sin pyarrow)
+        print(exc, file=sys.stderr)
+        return 2
+    tareas = [(d, args.todos, reglas) for d in dirs]
+    fallas = 0
+    with sumidero:
+        if args.procesos and args.procesos > 1 and len(tareas) > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=args.procesos) as ex:
+                salidas = list(ex.map(_verificar_o_error, tareas))
+        else:
+            salidas = map(_verificar_o_error, tareas)
+        for res, error in salidas:
+            if error:
+                fallas += 1
+                print(error, file=sys.stderr)
+            else:
+                sumidero.escribir(res)
+    return 2 if fallas else 0
+
+
+def cmd_flota(args) -> int:
+    from ingesta import ErrorIngesta
+    from flujo import verificar_flujo
+
+    try:
+        reglas = _reglas(args)
+        sumidero = abrir_sumidero(args.salida)
+    except (ValueError, OSError, ImportError) as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    ejecutor = None
+    if args.procesos and args.procesos > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        ejecutor = ProcessPoolExecutor(max_workers=args.procesos)
+    try:
+        with sumidero:
+            for _ in verificar_flujo(*_rutas(args.directorio), filas=args.filas, todos=args.todos,
+                                     ejecutor=ejecutor, sumidero=sumidero, reglas=reglas):
+                pass
+    except (ErrorIngesta, OSError) as exc:
+        print(exc, file=sys.stderr)
+        return 2
+    finally:
+        if ejecutor is not None:
+            ejecutor.shutdown()
+    return 0
+
+
+def cmd_servir(args) -> int:
+    from servicio import servir
+
+    servir(args.host, args.puerto, args.procesos)
+    return 0
+
+
+def main(argv=None) -> int:
+    p = argparse.ArgumentParser(description="Verificación de circuitos eléctricos sin interfaz")
+    sub = p.add_subparsers(dest="comando", required=True)
+
+    c = sub.add_parser("circuitos", help="un circuito por directorio (Trafos/Tramos/Usuarios/Curvas.csv)")
+    c.add_argument("directorios", nargs="*")
+    c.add_argument("--lista", help="archivo con un directorio por línea")
+    c.set_defaults(fn=cmd_circuitos)
+
+    f = sub.add_parser("flota", help="directorio con los 4 CSV de flota (id de circuito en la columna 0)")
+    f.add_argument("directorio")
+    f.add_argument("--filas", type=int, default=100_000, help="filas por bloque de lectura")
+    f.set_defaults(fn=cmd_flota)
+
+    for s in (c, f):
+        s.add_argument("--salida", default="-", help="resultados (.jsonl/.csv/.txt/.parquet; '-' = stdout)")
+        s.add_argument("--todos", action="store_true", help="todos los errores de cada circuito")
+        s.add_argument("--procesos", type=int, default=1)
+        s.add_argument("--reglas", help="archivo JSON de reglas de la norma (ver reglas.py)")
+
+    v = sub.add_parser("servir", help="servicio HTTP local con el pool de procesos caliente")
+    v.add_argument("--host", default="127.0.0.1")
+    v.add_argument("--puerto", type=int, default=8765)
+    v.add_argument("--procesos", type=int, default=None)
+    v.set_defaults(fn=cmd_servir)
+
+    args = p.parse_args(argv)
+    return args.fn(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
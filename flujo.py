@@ -0,0 +1,202 @@
+# flujo.py
+# Verificación en flujo: los CSV de flota se leen por bloques y cada circuito
+# se verifica apenas están completas sus filas, sin esperar al resto del archivo.
+#
+# Formato (igual que VerificarLote): Trafos una fila por circuito (columna 0 =
+# circuito); Tramos/Usuarios/Curvas con el id de circuito en `col_circuito` y
+# las filas de cada circuito contiguas, en el mismo orden de circuitos que
+# Trafos (si todos vienen ordenados por id, se cumple solo). Trafos se lee
+# completo (es chico); de los otros tres solo hay en memoria un bloque y el
+# circuito en curso. Cada bloque se valida con los esquemas de ingesta.py (el
+# id de circuito en `col_circuito` y las columnas declaradas corridas detrás):
+# un archivo malo se rechaza igual que con leer_circuito.
+#
+#   for res in verificar_flujo("Trafos.csv", "Tramos.csv", "Usuarios.csv", "Curvas.csv"):
+#       ...
+
+import os
+from collections import deque
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+from Verificar import verificar_circuito
+from ingesta import CURVAS, TRAFOS, TRAMOS, USUARIOS, ErrorIngesta, Esquema, _columnas_mixtas, con_circuito, tabla
+from instrumento import Instrumento
+from lote import _verificar_medido, _verificar_uno
+from reglas import por_circuito
+
+
+def _bloques(fuente, esquema: Esquema, filas: int):
+    # matrices float64 validadas con `esquema` (ver ingesta.tabla), `filas` filas
+    # por bloque. Las columnas numéricas se fijan con el primer bloque: una columna
+    # vacía en un bloque y con texto en otro no puede correr las siguientes
+    archivo = esquema.archivo
+    cols, fila0 = None, 0
+    for df in pd.read_csv(fuente, engine="c", chunksize=filas):
+        _columnas_mixtas(df, archivo, fila0)
+        if cols is None:
+            # solo encabezado: todas las columnas (como en leer_circuito)
+            cols = list(df.columns if len(df) == 0 else df.select_dtypes(include=["number"]).columns)
+        elif len(df):
+            texto = [c for c in cols if df[c].dtype.kind not in "biufc"]
+            if texto:
+                raise ErrorIngesta(f"{archivo}: la columna '{texto[0]}' tiene valores no numéricos "
+                                   f"(filas {fila0 + 2}-{fila0 + len(df) + 1})")
+        yield tabla(df[cols], esquema, fila0=fila0)
+        fila0 += len(df)
+
+
+def leer_trafos(fuente, filas: int = 100_000) -> np.ndarray:
+    """Tabla de trafos completa (una fila por circuito), validada como en leer_circuito."""
+    bloques = list(_bloques(fuente, TRAFOS, filas))
+    return np.vstack(bloques) if bloques else np.empty((0, 0))
+
+
+class LectorCircuitos:
+    """
+    Recorre un CSV de flota agrupado por circuito y genera (circuito, filas) con
+    las filas de cada circuito (sin la columna de id) en cuanto se completan.
+    `esquema` es el de un circuito (TRAMOS, USUARIOS, CURVAS): cada bloque se valida
+    con él corrido por la columna del id (ver ingesta.con_circuito).
+    `ancho` es la cantidad de columnas por circuito (se conoce tras el primer bloque).
+    Lanza ErrorIngesta si un circuito reaparece después de cerrado.
+    """
+
+    def __init__(self, fuente, esquema: Esquema = CURVAS, col_circuito: int = 0, filas: int = 100_000):
+        self.fuente, self.esquema = fuente, con_circuito(esquema, col_circuito)
+        self.archivo = esquema.archivo
+        self.col_circuito, self.filas = col_circuito, filas
+        self.ancho = 0
+
+    def __iter__(self):
+        vistos = set()
+        actual, partes = None, []
+        for bloque in _bloques(self.fuente, self.esquema, self.filas):
+            self.ancho = max(bloque.shape[1] - 1, 0)
+            ids = bloque[:, self.col_circuito]
+            validos = ~np.isnan(ids)
+            if not np.all(validos):
+                bloque, ids = bloque[validos], ids[validos]
+            if ids.size == 0:
+                continue
+            ids = ids.astype(np.int64)
+            datos = np.delete(bloque, self.col_circuito, axis=1)
+            cortes = np.flatnonzero(ids[1:] != ids[:-1]) + 1
+            for i, f in zip(np.r_[0, cortes].tolist(), np.r_[cortes, ids.size].tolist()):
+                c = int(ids[i])
+                if c == actual:
+                    partes.append(datos[i:f])
+                    continue
+                if actual is not None:
+                    yield actual, _unir(partes)
+                if c in vistos:
+                    raise ErrorIngesta(f"{self.archivo}: las filas del circuito {c} no están agrupadas")
+                vistos.add(c)
+                actual, partes = c, [datos[i:f]]
+        if actual is not None:
+            yield actual, _unir(partes)
+
+
+def _unir(partes):
+    return partes[0] if len(partes) == 1 else np.vstack(partes)
+
+
+class _Cursor:
+    # Cabeza de un LectorCircuitos para el merge con el orden de Trafos
+    def __init__(self, lector: LectorCircuitos, pos: dict):
+        self.lector, self.pos = lector, pos
+        self._it = iter(lector)
+        self.cab = next(self._it, None)
+
+    def tomar(self, circ: int) -> np.ndarray:
+        while self.cab is not None:
+            c, filas = self.cab
+            p = self.pos.get(c)
+            if p is None:
+                # circuito sin trafo: se descarta (como en VerificarLote)
+                self.cab = next(self._it, None)
+                continue
+            if p < self.pos[circ]:
+                raise ErrorIngesta(f"{self.lector.archivo}: el circuito {c} no sigue el orden de Trafos")
+            if c != circ:
+                break
+            self.cab = next(self._it, None)
+            return filas
+        return np.empty((0, self.lector.ancho))
+
+    def cerrar(self):
+        # tras la última fila de Trafos solo pueden quedar circuitos sin trafo; uno
+        # con trafo vino después de otro posterior y sus filas ya no tienen dónde ir
+        while self.cab is not None:
+            c = self.cab[0]
+            if c in self.pos:
+                raise ErrorIngesta(f"{self.lector.archivo}: el circuito {c} no sigue el orden de Trafos")
+            self.cab = next(self._it, None)
+
+
+def circuitos(DatosT: np.ndarray, tramos, usuarios, curvas, col_circuito: int = 0, filas: int = 100_000):
+    """Genera (DatosT, DatosL, DatosN, CurTemp) de cada circuito en el orden de DatosT."""
+    DatosT = np.atleast_2d(np.asarray(DatosT, dtype=float))
+    ids = [int(c) if not np.isnan(c) else -1 for c in DatosT[:, 0].tolist()] if DatosT.size else []
+    pos = {}
+    for k, c in enumerate(ids):
+        pos.setdefault(c, k)
+    cursores = [_Cursor(LectorCircuitos(f, e, col_circuito, filas), pos)
+                for f, e in ((tramos, TRAMOS), (usuarios, USUARIOS), (curvas, CURVAS))]
+    for fila, c in zip(DatosT, ids):
+        yield (fila,) + tuple(cur.tomar(c) for cur in cursores)
+    for cur in cursores:
+        cur.cerrar()
+
+
+def verificar_flujo(trafos, tramos, usuarios, curvas, col_circuito: int = 0, filas: int = 100_000,
+                    todos: bool = False, ejecutor=None, en_vuelo: int = None, sumidero=None,
+                    instrumento: Instrumento = None, reglas=None):
+    """
+    Genera el Resultado de cada circuito a medida que se leen los archivos
+    (en el orden de Trafos).
+        trafos : CSV de trafos o la matriz ya leída (ver leer_trafos)
+        filas : filas por bloque de lectura
+        ejecutor : concurrent.futures.Executor opcional (p. ej. un ProcessPoolExecutor
+                   compartido); se mantienen a lo sumo `en_vuelo` circuitos enviados
+        sumidero, instrumento, reglas : como en VerificarLote
+    """
+    DatosT = trafos if isinstance(trafos, np.ndarray) else leer_trafos(trafos, filas)
+    tareas = circuitos(DatosT, tramos, usuarios, curvas, col_circuito, filas)
+    elegir = por_circuito(reglas)
+
+    if ejecutor is None:
+        for T, L, N, C in tareas:
+            res = verificar_circuito(T, L, N, C, todos, instrumento, elegir(_id(T)))
+            if sumidero is not None:
+                sumidero.escribir(res)
+            yield res
+    else:
+        en_vuelo = en_vuelo or 2 * (os.cpu_count() or 1)
+        fn = _verificar_uno if instrumento is None else partial(_verificar_medido, umbral_s=instrumento.umbral_s)
+        pend = deque()
+        for t in tareas:
+            pend.append(ejecutor.submit(fn, (todos,) + t + (elegir(_id(t[0])),)))
+            if len(pend) >= en_vuelo:
+                yield _recoger(pend.popleft(), sumidero, instrumento)
+        while pend:
+            yield _recoger(pend.popleft(), sumidero, instrumento)
+
+    if sumidero is not None:
+        sumidero.vaciar()
+
+
+def _id(T) -> int:
+    return int(T[0]) if T.size and not np.isnan(T[0]) else -1
+
+
+def _recoger(fut, sumidero, instrumento):
+    res = fut.result()
+    if instrumento is not None:
+        res, inst = res
+        instrumento.combinar(inst)
+    if sumidero is not None:
+        sumidero.escribir(res)
+    return res
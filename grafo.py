@@ -0,0 +1,268 @@
+# grafo.py
+# Núcleo de grafos sobre arreglos enteros compactos (CSR) para Verificar.
+# Los nodos se numeran 0..N-1 en orden de primera aparición en los tramos y los
+# vecinos de cada nodo quedan en orden de primera aparición de la arista; es el
+# mismo orden que usa networkx.Graph, así los informes salen idénticos.
+
+import numpy as np
+
+
+class Nodos:
+    """
+    Internado de ids de nodo de un circuito en índices densos (un solo np.unique).
+        ids      : índice denso -> id original
+        n_tramos : los primeros n_tramos índices son los nodos de tramos, en orden
+                   de primera aparición (el mismo índice que GrafoCSR); el resto
+                   son nodos que solo aparecen en `otros` (p. ej. usuarios)
+        tramos   : (M, 2) extremos densos de cada fila de `edges`
+        otros    : índice denso de cada id de `otros`
+    """
+
+    def __init__(self, edges: np.ndarray, otros=()):
+        e = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+        o = np.asarray(otros, dtype=np.int64).ravel()
+        todos = np.concatenate([e.ravel(), o])
+        uniq, primero, inv = np.unique(todos, return_index=True, return_inverse=True)
+        # los tramos van primero en `todos`, así sus nodos quedan en 0..n_tramos-1
+        orden = np.argsort(primero, kind="stable")
+        pos = np.empty(uniq.size, dtype=np.int64)
+        pos[orden] = np.arange(uniq.size)
+        inv = pos[inv.ravel()]
+        self.ids = uniq[orden]
+        self.n_tramos = int(np.count_nonzero(primero < e.size))
+        self.tramos = inv[:e.size].reshape(-1, 2)
+        self.otros = inv[e.size:]
+        self._ids_ord = uniq
+        self._pos_ord = pos
+
+    @property
+    def K(self) -> int:
+        return int(self.ids.size)
+
+    def indice(self, ids) -> np.ndarray:
+        """Índice denso de cada id original (-1 si no está)."""
+        ids = np.asarray(ids, dtype=np.int64)
+        if self._ids_ord.size == 0:
+            return np.full(ids.shape, -1, dtype=np.int64)
+        k = np.searchsorted(self._ids_ord, ids)
+        k = np.minimum(k, self._ids_ord.size - 1)
+        return np.where(self._ids_ord[k] == ids, self._pos_ord[k], -1)
+
+    def en_tramos(self, idx) -> np.ndarray:
+        """Índice en el grafo de cada índice denso (-1 si no es nodo de tramos)."""
+        idx = np.asarray(idx, dtype=np.int64)
+        return np.where((idx >= 0) & (idx < self.n_tramos), idx, -1)
+
+
+class GrafoCSR:
+    """
+    Grafo simple no dirigido en formato CSR.
+        nodos   : ids originales, índice denso -> id
+        extremos: (M, 2) extremos densos de cada arista única
+        fila    : fila de DatosL donde aparece por primera vez cada arista
+        indptr, vecinos, arista : adyacencia CSR (vecino denso e id de arista)
+    Los lazos (Ni == Nf) y los paralelos no forman parte del grafo.
+    `internado` (Nodos de las mismas filas ordenadas) evita volver a internar los ids.
+    """
+
+    def __init__(self, edges: np.ndarray, internado: Nodos = None):
+        if internado is None:
+            internado = Nodos(np.sort(np.asarray(edges, dtype=np.int64).reshape(-1, 2), axis=1))
+        self._internado = internado
+        self.nodos = internado.ids[:internado.n_tramos]
+        d = internado.tramos
+
+        # Aristas únicas sin lazos, en orden de primera aparición
+        N = self.nodos.size
+        filas = np.flatnonzero(d[:, 0] != d[:, 1])
+        a = np.minimum(d[filas, 0], d[filas, 1])
+        b = np.maximum(d[filas, 0], d[filas, 1])
+        _, prim = np.unique(a * N + b, return_index=True)
+        prim.sort()
+        self.fila = filas[prim]
+        self.extremos = d[self.fila]
+
+        # CSR: vecinos de cada nodo ordenados por id de arista
+        M = self.fila.size
+        src = self.extremos.ravel()
+        dst = self.extremos[:, ::-1].ravel()
+        eid = np.repeat(np.arange(M, dtype=np.int64), 2)
+        orden = np.argsort(src, kind="stable")
+        self.vecinos = dst[orden]
+        self.arista = eid[orden]
+        self.indptr = np.zeros(N + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=N), out=self.indptr[1:])
+
+    @property
+    def N(self) -> int:
+        return int(self.nodos.size)
+
+    @property
+    def M(self) -> int:
+        return int(self.fila.size)
+
+    def grado(self) -> np.ndarray:
+        return np.diff(self.indptr)
+
+    def indice(self, ids) -> np.ndarray:
+        """Índice denso de cada id original (-1 si no está en el grafo)."""
+        return self._internado.en_tramos(self._internado.indice(ids))
+
+    def _expandir(self, frontera: np.ndarray):
+        # Posiciones CSR de los vecinos de todos los nodos de la frontera, en orden
+        ini = self.indptr[frontera]
+        cnt = self.indptr[frontera + 1] - ini
+        total = int(cnt.sum())
+        if total == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        off = np.repeat(ini - (np.cumsum(cnt) - cnt), cnt)
+        return off + np.arange(total), np.repeat(frontera, cnt)
+
+
+# Fronteras más chicas que esto se expanden nodo a nodo: en un alimentador radial
+# profundo casi todos los niveles tienen 1 o 2 nodos y el costo fijo de numpy
+# por nivel pesa más que el recorrido en sí
+_FRONTERA_CHICA = 256
+
+
+def bfs(g: GrafoCSR, raiz: int):
+    """
+    BFS por niveles desde `raiz`.
+    Devuelve (orden, padre, arista_padre): orden de descubrimiento (denso) y, por
+    nodo, su padre y la arista que lo une con él (-1 si no tiene o no se alcanzó).
+    """
+    padre = np.full(g.N, -1, dtype=np.int64)
+    arista_padre = np.full(g.N, -1, dtype=np.int64)
+    visto = bytearray(g.N)                         # compartido por los dos modos
+    visto_np = np.frombuffer(visto, dtype=bool)
+    visto[raiz] = True
+    frontera = [raiz]
+    niveles = [np.array(frontera, dtype=np.int64)]
+    listas = None                                  # CSR como listas (modo escalar)
+    nodos, padres, aristas = [], [], []            # descubiertos en modo escalar sin volcar
+
+    def volcar():
+        if nodos:
+            v = np.array(nodos, dtype=np.int64)
+            padre[v] = padres
+            arista_padre[v] = aristas
+            niveles.append(v)
+            nodos.clear(), padres.clear(), aristas.clear()
+
+    while len(frontera):
+        if len(frontera) < _FRONTERA_CHICA:
+            # nivel chico: mismo orden que el vectorizado (frontera, luego vecinos en orden CSR)
+            if listas is None:
+                listas = g.indptr.tolist(), g.vecinos.tolist(), g.arista.tolist()
+            indptr, vecinos, arista = listas
+            inicio = len(nodos)
+            for u in (frontera.tolist() if isinstance(frontera, np.ndarray) else frontera):
+                for k in range(indptr[u], indptr[u + 1]):
+                    v = vecinos[k]
+                    if not visto[v]:
+                        visto[v] = True
+                        nodos.append(v)
+                        padres.append(u)
+                        aristas.append(arista[k])
+            frontera = nodos[inicio:]
+            continue
+
+        volcar()
+        posic, origen = g._expandir(np.asarray(frontera, dtype=np.int64))
+        v = g.vecinos[posic]
+        nuevo = ~visto_np[v]
+        if not np.any(nuevo):
+            break
+        posic, origen, v = posic[nuevo], origen[nuevo], v[nuevo]
+        # cada nodo queda con el primer padre que lo ve, en el orden de la frontera
+        _, prim = np.unique(v, return_index=True)
+        prim.sort()
+        frontera = v[prim]
+        padre[frontera] = origen[prim]
+        arista_padre[frontera] = g.arista[posic[prim]]
+        visto_np[frontera] = True
+        niveles.append(frontera)
+
+    volcar()
+    return np.concatenate(niveles), padre, arista_padre
+
+
+def _biconexas(g: GrafoCSR):
+    # Hopcroft-Tarjan iterativo con el mismo recorrido que networkx; genera
+    # (pares, ids de arista) por componente
+    indptr = g.indptr.tolist()
+    vecinos = g.vecinos.tolist()
+    arista = g.arista.tolist()
+    descubierto = [-1] * g.N
+    low = [0] * g.N
+    tiempo = 0
+
+    for inicio in range(g.N):
+        if descubierto[inicio] != -1:
+            continue
+        descubierto[inicio] = low[inicio] = tiempo
+        tiempo += 1
+        pila_aristas = []
+        pila_ids = []
+        pos_arista = {}
+        pila = [[inicio, inicio, indptr[inicio]]]
+        while pila:
+            marco = pila[-1]
+            abuelo, padre, k = marco
+            if k < indptr[padre + 1]:
+                marco[2] = k + 1
+                hijo = vecinos[k]
+                if abuelo == hijo:
+                    continue
+                if descubierto[hijo] != -1:
+                    if descubierto[hijo] <= descubierto[padre]:  # arista de retorno
+                        low[padre] = min(low[padre], descubierto[hijo])
+                        pos_arista[padre, hijo] = len(pila_aristas)
+                        pila_aristas.append((padre, hijo))
+                        pila_ids.append(arista[k])
+                else:
+                    low[hijo] = descubierto[hijo] = tiempo
+                    tiempo += 1
+                    pila.append([padre, hijo, indptr[hijo]])
+                    pos_arista[padre, hijo] = len(pila_aristas)
+                    pila_aristas.append((padre, hijo))
+                    pila_ids.append(arista[k])
+            else:
+                pila.pop()
+                if len(pila) > 1:
+                    if low[padre] >= descubierto[abuelo]:
+                        i = pos_arista[abuelo, padre]
+                        yield pila_aristas[i:], pila_ids[i:]
+                        del pila_aristas[i:], pila_ids[i:]
+                    low[abuelo] = min(low[padre], low[abuelo])
+                elif pila:
+                    i = pos_arista[abuelo, padre]
+                    yield pila_aristas[i:], pila_ids[i:]
+                    del pila_aristas[i:], pila_ids[i:]
+
+
+def etiquetas_biconexas(g: GrafoCSR):
+    """
+    Componentes biconexas (mismo recorrido que networkx.biconnected_components).
+    Devuelve (componentes, etiqueta): por componente, la lista de aristas (u, v)
+    densas en el orden en que se apilaron y, por arista, el índice de su componente.
+    """
+    etiqueta = np.full(g.M, -1, dtype=np.int64)
+    comps = []
+    for pares, ids in _biconexas(g):
+        etiqueta[ids] = len(comps)
+        comps.append(pares)
+    return comps, etiqueta
+
+
+def orden_subgrafo(g: GrafoCSR, comp):
+    """
+    Nodos (densos) de una componente biconexa en el orden en que los recorre
+    networkx con G.subgraph(bic).nodes, para conservar el orden de los informes.
+    """
+    ids = g.nodos
+    bic = set(int(ids[n]) for arista in comp for n in arista)
+    vista = set(n for n in bic)
+    if 2 * len(vista) < g.N:
+        return g.indice(np.fromiter(vista, dtype=np.int64, count=len(vista)))
+    return np.sort(g.indice(np.fromiter(vista, dtype=np.int64, count=len(vista))))
@@ -0,0 +1,211 @@
+# informe.py
+# Resultados estructurados de Verificar y sumideros donde se guardan.
+# El informe de texto clásico ('Informe de errores.txt') es solo uno de los
+# formatos: los datos (código, nodos, tramos) quedan siempre en el Resultado.
+
+import csv
+import json
+import threading
+from dataclasses import dataclass, field, asdict
+
+
+@dataclass
+class Hallazgo:
+    """
+    Un error encontrado en un circuito.
+        codigo : código de error (ver Verificar.py)
+        lineas : detalle en el formato del informe de texto
+        nodos  : nodos implicados
+        tramos : tramos implicados (ni, nf); en los errores de faseo (25, 30)
+                 cada entrada es el par de tramos (a, b, c, d)
+    """
+    codigo: int
+    lineas: list
+    nodos: list = field(default_factory=list)
+    tramos: list = field(default_factory=list)
+
+
+@dataclass
+class Resultado:
+    """Resultado de verificar un circuito (hallazgos vacío = circuito normal)."""
+    circuito: int
+    hallazgos: list = field(default_factory=list)
+
+    @property
+    def codigo(self) -> int:
+        # Primer error encontrado (0 si no hay), igual que el Error de Verificar
+        return self.hallazgos[0].codigo if self.hallazgos else 0
+
+    @property
+    def codigos(self) -> list:
+        return [h.codigo for h in self.hallazgos]
+
+    def lineas(self) -> list:
+        """Bloques del informe de texto clásico."""
+        if not self.hallazgos:
+            return [f"\r\nCircuito: {self.circuito}\r\nError: 0\r\nCircuito normal\r\n"]
+        out = []
+        for h in self.hallazgos:
+            out.append(f"\r\nCircuito: {self.circuito}\r\nError: {h.codigo}\r\n")
+            out.extend(h.lineas)
+        return out
+
+    def registros(self) -> list:
+        """Una fila plana por hallazgo (una fila con código 0 si es normal)."""
+        if not self.hallazgos:
+            return [{"circuito": self.circuito, "codigo": 0, "detalle": "Circuito normal",
+                     "nodos": [], "tramos": []}]
+        return [{"circuito": self.circuito, "codigo": h.codigo,
+                 "detalle": "\n".join(s.strip() for s in h.lineas),
+                 "nodos": list(h.nodos), "tramos": [list(t) for t in h.tramos]}
+                for h in self.hallazgos]
+
+    def a_dict(self) -> dict:
+        return {"circuito": self.circuito, "codigo": self.codigo,
+                "hallazgos": [asdict(h) for h in self.hallazgos]}
+
+    @classmethod
+    def desde_dict(cls, d: dict) -> "Resultado":
+        return cls(d["circuito"], [
+            Hallazgo(h["codigo"], list(h["lineas"]), list(h["nodos"]), [tuple(t) for t in h["tramos"]])
+            for h in d["hallazgos"]
+        ])
+
+
+# =======================
+# Sumideros
+# =======================
+
+class Sumidero:
+    """
+    Destino de resultados con buffer. `escribir` acumula y se vuelca en bloque
+    cada `buffer` resultados (y al `vaciar`/`cerrar`). Es seguro entre hilos;
+    con procesos, los workers devuelven Resultados y el proceso padre escribe.
+    """
+
+    def __init__(self, buffer: int = 1000):
+        self.buffer = max(int(buffer), 1)
+        self._pend = []
+        self._lock = threading.Lock()
+
+    def escribir(self, res: Resultado):
+        with self._lock:
+            self._pend.append(res)
+            if len(self._pend) >= self.buffer:
+                self._vaciar()
+
+    def vaciar(self):
+        with self._lock:
+            self._vaciar()
+
+    def _vaciar(self):
+        if self._pend:
+            pend, self._pend = self._pend, []
+            self._volcar(pend)
+
+    def _volcar(self, resultados):
+        raise NotImplementedError
+
+    def cerrar(self):
+        self.vaciar()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.cerrar()
+
+
+class SumideroMemoria(Sumidero):
+    """Guarda los Resultados en la lista `resultados`."""
+
+    def __init__(self):
+        super().__init__(buffer=1)
+        self.resultados = []
+
+    def _volcar(self, resultados):
+        self.resultados.extend(resultados)
+
+
+class SumideroTexto(Sumidero):
+    """Formato clásico: bloques 'Circuito / Error / detalle' agregados al archivo."""
+
+    def __init__(self, ruta='Informe de errores.txt', buffer: int = 1000):
+        super().__init__(buffer)
+        self.ruta = ruta
+
+    def _volcar(self, resultados):
+        with open(self.ruta, 'a', encoding='utf-8') as fid:
+            fid.write("".join(s for r in resultados for s in r.lineas()))
+
+
+class SumideroJSONL(Sumidero):
+    """Un objeto JSON por circuito (Resultado.a_dict) y por línea."""
+
+    def __init__(self, ruta, buffer: int = 1000):
+        super().__init__(buffer)
+        self.ruta = ruta
+
+    def _volcar(self, resultados):
+        with open(self.ruta, 'a', encoding='utf-8') as fid:
+            fid.write("".join(json.dumps(r.a_dict(), ensure_ascii=False) + "\n" for r in resultados))
+
+
+_COLUMNAS = ["circuito", "codigo", "detalle", "nodos", "tramos"]
+
+
+class SumideroCSV(Sumidero):
+    """Una fila por hallazgo; nodos y tramos van como listas JSON."""
+
+    def __init__(self, ruta, buffer: int = 1000):
+        super().__init__(buffer)
+        self.ruta = ruta
+        self._encabezado = True
+
+    def _volcar(self, resultados):
+        with open(self.ruta, 'a', encoding='utf-8', newline='') as fid:
+            w = csv.DictWriter(fid, fieldnames=_COLUMNAS)
+            if self._encabezado and fid.tell() == 0:
+                w.writeheader()
+            self._encabezado = False
+            for r in resultados:
+                for reg in r.registros():
+                    reg["nodos"] = json.dumps(reg["nodos"])
+                    reg["tramos"] = json.dumps(reg["tramos"])
+                    w.writerow(reg)
+
+
+class SumideroParquet(Sumidero):
+    """Una fila por hallazgo en Parquet (requiere pyarrow); cada volcado es un row group."""
+
+    def __init__(self, ruta, buffer: int = 10000):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise ImportError("SumideroParquet requiere pyarrow (pip install pyarrow)") from exc
+        super().__init__(buffer)
+        self.ruta = ruta
+        self._pa, self._pq = pa, pq
+        self._schema = pa.schema([
+            ("circuito", pa.int64()),
+            ("codigo", pa.int32()),
+            ("detalle", pa.string()),
+            ("nodos", pa.list_(pa.int64())),
+            ("tramos", pa.list_(pa.list_(pa.int64()))),
+        ])
+        self._writer = None
+
+    def _volcar(self, resultados):
+        regs = [reg for r in resultados for reg in r.registros()]
+        tabla = self._pa.Table.from_pylist(regs, schema=self._schema)
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.ruta, self._schema)
+        self._writer.write_table(tabla)
+
+    def cerrar(self):
+        with self._lock:
+            self._vaciar()
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
@@ -0,0 +1,204 @@
+# ingesta.py
+# Lectura de los 4 CSV con esquema declarado.
+# Verificar trabaja por posición de columna (DatosL[:, 8], DatosN[:, 6], ...):
+# aquí se declara qué columna es cada dato y se valida antes de verificar
+# (ids de nodo enteros y presentes, códigos vacíos -> -1). La tabla se arma
+# directo en la matriz float64 posicional que usa Verificar, sin copias
+# intermedias. Si pyarrow está instalado se usa su lector CSV (multihilo); si
+# no, el motor C de pandas.
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+_pacsv = None   # pyarrow.csv, se importa en la primera lectura (es opcional y pesado)
+
+
+def _pyarrow_csv():
+    global _pacsv
+    if _pacsv is None:
+        try:
+            import pyarrow.csv as mod
+        except ImportError:
+            mod = False
+        _pacsv = mod
+    return _pacsv
+
+
+class ErrorIngesta(ValueError):
+    """Archivo con columnas faltantes o con datos no numéricos en columnas declaradas."""
+
+
+@dataclass(frozen=True)
+class Columna:
+    pos: int        # posición que espera Verificar
+    nombre: str     # nombre canónico (también se acepta como encabezado del CSV)
+    clase: str      # 'id' = id de nodo (obligatorio, entero), 'codigo' (vacío -> -1), 'real'
+
+
+@dataclass(frozen=True)
+class Esquema:
+    archivo: str
+    columnas: tuple
+
+    @property
+    def minimo(self) -> int:
+        return max((c.pos for c in self.columnas), default=-1) + 1
+
+
+TRAFOS = Esquema("Trafos.csv", (
+    Columna(0, "nodo", "real"),       # nodo del trafo (slack) = id de circuito; NaN se reporta en Verificar
+    Columna(2, "tipo", "real"),       # 1 monofásico / 3 trifásico
+    Columna(3, "vp", "real"),
+    Columna(4, "vs", "real"),
+    Columna(5, "topologia", "real"),  # 1 radial / 0 enmallado
+))
+
+TRAMOS = Esquema("Tramos.csv", (
+    Columna(0, "ni", "id"),
+    Columna(1, "nf", "id"),
+    Columna(2, "fase", "codigo"),
+    Columna(4, "montaje", "codigo"),
+    Columna(6, "material_fase", "codigo"),
+    Columna(8, "material_neutro", "codigo"),
+))
+
+USUARIOS = Esquema("Usuarios.csv", (
+    Columna(0, "nodo", "id"),
+    Columna(1, "fase", "codigo"),
+    Columna(4, "medidor", "codigo"),
+    Columna(5, "estrato", "codigo"),
+    Columna(6, "clase", "codigo"),
+))
+
+CURVAS = Esquema("Curvas.csv", ())
+
+
+def con_circuito(esquema: Esquema, col: int = 0) -> Esquema:
+    """`esquema` en un archivo de flota: el id de circuito en la columna `col` y las declaradas corridas detrás."""
+    columnas = [Columna(c.pos + (c.pos >= col), c.nombre, c.clase) for c in esquema.columnas]
+    columnas.append(Columna(col, "circuito", "real"))   # id vacío: fila descartada, como en VerificarLote
+    return Esquema(esquema.archivo, tuple(sorted(columnas, key=lambda c: c.pos)))
+
+
+def _leer(fuente) -> pd.DataFrame:
+    # `fuente` puede ser ruta o archivo abierto (p. ej. el UploadedFile de Streamlit);
+    # se pasa directo al parser, sin copiar el contenido a otro buffer.
+    pacsv = _pyarrow_csv()
+    if pacsv:
+        tabla = pacsv.read_csv(fuente)
+        # una columna sin ningún valor llega con tipo null (objeto en pandas) y
+        # select_dtypes la descartaría, corriendo las siguientes: float64 como en pandas
+        for i, campo in enumerate(tabla.schema):
+            if str(campo.type) == "null":
+                tabla = tabla.set_column(i, campo.name, tabla.column(i).cast("float64"))
+        return tabla.to_pandas()
+    return pd.read_csv(fuente, engine="c")
+
+
+def _columnas_mixtas(df: pd.DataFrame, archivo: str, fila0: int = 0):
+    # Una columna de texto con algún valor numérico es una columna numérica sucia:
+    # si se descartara (como hace select_dtypes) las siguientes quedarían corridas.
+    for nombre in df.columns:
+        col = df[nombre]
+        if col.dtype.kind in "biufc":
+            continue
+        num = pd.to_numeric(col, errors="coerce")
+        if num.notna().any():
+            malas = np.flatnonzero(num.isna() & col.notna())
+            filas = ", ".join(str(fila0 + i + 2) for i in malas[:5])
+            raise ErrorIngesta(
+                f"{archivo}: la columna '{nombre}' tiene valores no numéricos (filas {filas}"
+                f"{', ...' if malas.size > 5 else ''})"
+            )
+
+
+def _validar(valores: np.ndarray, col: Columna, archivo: str, fila0: int = 0):
+    # valida (y corrige en el lugar) una columna declarada de la matriz;
+    # `fila0` = filas del archivo antes de este bloque (para los mensajes)
+    if col.clase == "real":
+        return
+    faltan = np.isnan(valores)
+    if col.clase == "id":
+        if np.any(faltan):
+            fila = fila0 + int(np.flatnonzero(faltan)[0]) + 2
+            raise ErrorIngesta(f"{archivo}: la columna '{col.nombre}' tiene ids de nodo vacíos (fila {fila})")
+        if np.any(valores != np.trunc(valores)):
+            fila = fila0 + int(np.flatnonzero(valores != np.trunc(valores))[0]) + 2
+            raise ErrorIngesta(f"{archivo}: la columna '{col.nombre}' tiene ids de nodo no enteros (fila {fila})")
+        return
+    # código vacío -> -1 (código desconocido, lo reporta Verificar)
+    valores[faltan] = -1
+
+
+def tabla(df: pd.DataFrame, esquema: Esquema, mapeo: dict = None, fila0: int = 0) -> np.ndarray:
+    """
+    Matriz float64 posicional (formato de Verificar) de un DataFrame ya leído,
+    validada según `esquema` (ver leer_tabla). `fila0` = filas del archivo
+    antes de `df`, cuando se lee por bloques.
+    """
+    archivo = esquema.archivo
+    if len(df) == 0:
+        # archivo solo con encabezado: circuito sin tramos/usuarios
+        df = df.astype(np.float64)
+    _columnas_mixtas(df, archivo, fila0)
+    num = df.select_dtypes(include=["number"])
+
+    if mapeo is None and esquema.columnas:
+        encabezados = {str(c).strip().lower(): c for c in num.columns}
+        if all(c.nombre in encabezados for c in esquema.columnas):
+            mapeo = {c.nombre: encabezados[c.nombre] for c in esquema.columnas}
+
+    if mapeo:
+        faltan = [f"'{mapeo.get(c.nombre, c.nombre)}'" for c in esquema.columnas
+                  if mapeo.get(c.nombre) not in num.columns]
+        if faltan:
+            raise ErrorIngesta(f"{archivo}: faltan las columnas numéricas {', '.join(faltan)}")
+        # columnas declaradas en su posición; el resto en el orden del archivo
+        usadas = set(mapeo[c.nombre] for c in esquema.columnas)
+        resto = iter(c for c in num.columns if c not in usadas)
+        por_pos = {c.pos: mapeo[c.nombre] for c in esquema.columnas}
+        orden = [por_pos[i] if i in por_pos else next(resto, None) for i in range(esquema.minimo)]
+        orden += list(resto)
+    else:
+        if num.shape[1] < esquema.minimo:
+            raise ErrorIngesta(
+                f"{archivo}: se esperaban al menos {esquema.minimo} columnas numéricas y hay {num.shape[1]}"
+            )
+        orden = list(num.columns)
+
+    # una sola copia: cada columna se vuelca en su posición de la matriz
+    out = np.empty((len(num), len(orden)), dtype=np.float64)
+    for j, nombre in enumerate(orden):
+        # None: posición sin uso en Verificar que el archivo no trae
+        out[:, j] = np.nan if nombre is None else num[nombre].to_numpy()
+    for col in esquema.columnas:
+        _validar(out[:, col.pos], col, archivo, fila0)
+    return out
+
+
+def leer_tabla(fuente, esquema: Esquema, mapeo: dict = None) -> np.ndarray:
+    """
+    Lee un CSV según `esquema` y devuelve la matriz float64 con las columnas
+    numéricas en el orden posicional que espera Verificar.
+        mapeo : {nombre_canónico: encabezado_en_el_csv} opcional. Si no se da y el
+                CSV trae los nombres canónicos como encabezado, se usan; si no,
+                se toma la posición entre las columnas numéricas (como antes).
+    Lanza ErrorIngesta si faltan columnas, hay datos no numéricos en ellas o
+    ids de nodo vacíos o no enteros.
+    """
+    return tabla(_leer(fuente), esquema, mapeo)
+
+
+def leer_circuito(trafos, tramos, usuarios, curvas, mapeos: dict = None):
+    """
+    Lee los 4 archivos de un circuito y devuelve (DatosT, DatosL, DatosN, CurTemp)
+    listos para Verificar. `mapeos` = {'trafos': {...}, 'tramos': {...}, ...}.
+    """
+    mapeos = mapeos or {}
+    T = leer_tabla(trafos, TRAFOS, mapeos.get("trafos"))
+    L = leer_tabla(tramos, TRAMOS, mapeos.get("tramos"))
+    N = leer_tabla(usuarios, USUARIOS, mapeos.get("usuarios"))
+    C = leer_tabla(curvas, CURVAS, mapeos.get("curvas"))
+    return T.ravel(), L, N, C
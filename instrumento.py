@@ -0,0 +1,199 @@
+# instrumento.py
+# Medición opcional de Verificar: tiempo por etapa, tamaño del grafo y
+# distribución de códigos de error. Sin instrumento, Verificar sigue por el
+# camino de siempre (sin relojes ni objetos extra).
+#
+#   inst = Instrumento(umbral_s=1.0)
+#   VerificarLote(..., instrumento=inst)
+#   inst.guardar("verificar.prom")   # texto Prometheus (o .json)
+
+import json
+import time
+from collections import Counter
+
+# Etapa de cada check (los mismos bloques que en Verificar.py)
+ETAPA_CHECK = {
+    **dict.fromkeys((35, 36, 37, 2, 3, 4, 1), "datos"),
+    **dict.fromkeys((8, 9, 11, 13, 29), "tramos"),
+    **dict.fromkeys((14, 15, 34, 33, 16, 18, 19, 20, 27), "usuarios"),
+    **dict.fromkeys((22, 26, 24), "topologia"),
+    **dict.fromkeys((25, 23), "faseo_radial"),
+    **dict.fromkeys((30, 31), "faseo_enmallado"),
+}
+# Intermedios de _Analisis que se miden aparte (su tiempo no se cuenta en el check que los pide)
+ETAPAS_GRAFO = ("grafo", "bfs", "biconexas")
+
+
+class _Etapa:
+    __slots__ = ("med", "nombre")
+
+    def __init__(self, med, nombre):
+        self.med, self.nombre = med, nombre
+
+    def __enter__(self):
+        self.med._pila.append([time.perf_counter(), 0.0])
+        return self
+
+    def __exit__(self, *exc):
+        pila = self.med._pila
+        t0, hijos = pila.pop()
+        dt = time.perf_counter() - t0
+        t = self.med.tiempos
+        t[self.nombre] = t.get(self.nombre, 0.0) + dt - hijos   # tiempo exclusivo
+        if pila:
+            pila[-1][1] += dt
+
+
+class Medicion:
+    """Mediciones de un circuito (las llena verificar_circuito)."""
+
+    __slots__ = ("circuito", "tiempos", "total_s", "nodos", "tramos", "biconexas", "grado_max",
+                 "codigos", "_pila")
+
+    def __init__(self):
+        self.circuito = -1
+        self.tiempos = {}
+        self.total_s = 0.0
+        self.nodos = self.tramos = self.biconexas = self.grado_max = None
+        self.codigos = []
+        self._pila = []
+
+    def etapa(self, nombre: str) -> _Etapa:
+        return _Etapa(self, nombre)
+
+    def cerrar(self, a, res, total_s: float):
+        # tamaños solo de lo que el circuito llegó a calcular
+        self.circuito = res.circuito
+        self.codigos = res.codigos
+        self.total_s = total_s
+        calc = a.__dict__
+        if "G" in calc:
+            G = calc["G"]
+            self.nodos, self.tramos = G.N, G.M
+            self.grado_max = int(G.grado().max()) if G.N else 0
+        if "biconexas" in calc:
+            self.biconexas = len(calc["biconexas"][0])
+
+    def a_dict(self) -> dict:
+        return {"circuito": self.circuito, "total_s": self.total_s, "tiempos_s": dict(self.tiempos),
+                "nodos": self.nodos, "tramos": self.tramos, "biconexas": self.biconexas,
+                "grado_max": self.grado_max, "codigos": list(self.codigos)}
+
+
+class Instrumento:
+    """
+    Acumula las Mediciones de muchos circuitos.
+        umbral_s   : los circuitos que tardan más que esto se guardan completos en
+                     `lentos` (para ver por qué un lote no cumple su tiempo)
+        max_lentos : cuántos de esos se conservan (los más lentos)
+    Para usarlo como callback basta con redefinir `registrar(medicion)`.
+    """
+
+    def __init__(self, umbral_s: float = None, max_lentos: int = 100):
+        self.umbral_s = umbral_s
+        self.max_lentos = max_lentos
+        self.circuitos = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.etapas = {}            # etapa -> [suma_s, veces, max_s]
+        self.errores = Counter()    # código -> circuitos (0 = normal)
+        self.maximos = {"nodos": 0, "tramos": 0, "biconexas": 0, "grado_max": 0}
+        self.lentos = []
+
+    def registrar(self, med: Medicion):
+        self.circuitos += 1
+        self.total_s += med.total_s
+        self.max_s = max(self.max_s, med.total_s)
+        for nombre, t in med.tiempos.items():
+            e = self.etapas.setdefault(nombre, [0.0, 0, 0.0])
+            e[0] += t
+            e[1] += 1
+            e[2] = max(e[2], t)
+        self.errores.update(med.codigos or [0])
+        for k in self.maximos:
+            v = getattr(med, k)
+            if v is not None and v > self.maximos[k]:
+                self.maximos[k] = v
+        if self.umbral_s is not None and med.total_s > self.umbral_s:
+            self._lento(med.a_dict())
+
+    def registrar_resultado(self, res):
+        """Cuenta un circuito resuelto sin medir (p. ej. por el prefiltro): solo circuito y códigos."""
+        med = Medicion()
+        med.circuito, med.codigos = res.circuito, res.codigos
+        self.registrar(med)
+
+    def _lento(self, d):
+        self.lentos.append(d)
+        if len(self.lentos) > self.max_lentos:
+            self.lentos.sort(key=lambda x: -x["total_s"])
+            del self.lentos[self.max_lentos:]
+
+    def combinar(self, otro: "Instrumento"):
+        """Suma al propio las cuentas de `otro` (p. ej. el de un worker)."""
+        self.circuitos += otro.circuitos
+        self.total_s += otro.total_s
+        self.max_s = max(self.max_s, otro.max_s)
+        for nombre, (s, n, m) in otro.etapas.items():
+            e = self.etapas.setdefault(nombre, [0.0, 0, 0.0])
+            e[0] += s
+            e[1] += n
+            e[2] = max(e[2], m)
+        self.errores.update(otro.errores)
+        for k, v in otro.maximos.items():
+            self.maximos[k] = max(self.maximos[k], v)
+        for d in otro.lentos:
+            if self.umbral_s is None or d["total_s"] > self.umbral_s:
+                self._lento(d)
+
+    # --- exportación ---
+    def a_dict(self) -> dict:
+        return {
+            "circuitos": self.circuitos,
+            "total_s": self.total_s,
+            "max_s": self.max_s,
+            "etapas": {k: {"suma_s": s, "veces": n, "max_s": m} for k, (s, n, m) in self.etapas.items()},
+            "errores": {str(k): v for k, v in sorted(self.errores.items())},
+            "maximos": dict(self.maximos),
+            "lentos": sorted(self.lentos, key=lambda x: -x["total_s"]),
+        }
+
+    def a_prometheus(self, prefijo: str = "verificar") -> str:
+        p = prefijo
+        out = [
+            f"# HELP {p}_circuitos_total Circuitos verificados.",
+            f"# TYPE {p}_circuitos_total counter",
+            f"{p}_circuitos_total {self.circuitos}",
+            f"# HELP {p}_circuito_segundos Tiempo total por circuito.",
+            f"# TYPE {p}_circuito_segundos summary",
+            f"{p}_circuito_segundos_sum {self.total_s!r}",
+            f"{p}_circuito_segundos_count {self.circuitos}",
+            f"# HELP {p}_circuito_segundos_max Circuito más lento.",
+            f"# TYPE {p}_circuito_segundos_max gauge",
+            f"{p}_circuito_segundos_max {self.max_s!r}",
+            f"# HELP {p}_etapa_segundos Tiempo exclusivo por etapa.",
+            f"# TYPE {p}_etapa_segundos summary",
+        ]
+        for k, (s, n, _) in sorted(self.etapas.items()):
+            out.append(f'{p}_etapa_segundos_sum{{etapa="{k}"}} {s!r}')
+            out.append(f'{p}_etapa_segundos_count{{etapa="{k}"}} {n}')
+        out += [f"# HELP {p}_etapa_segundos_max Máximo por etapa en un circuito.",
+                f"# TYPE {p}_etapa_segundos_max gauge"]
+        for k, (_, _, m) in sorted(self.etapas.items()):
+            out.append(f'{p}_etapa_segundos_max{{etapa="{k}"}} {m!r}')
+        out += [f"# HELP {p}_errores_total Circuitos por código de error (0 = normal).",
+                f"# TYPE {p}_errores_total counter"]
+        for k, v in sorted(self.errores.items()):
+            out.append(f'{p}_errores_total{{codigo="{k}"}} {v}')
+        out += [f"# HELP {p}_grafo_max Tamaño máximo del grafo visto.",
+                f"# TYPE {p}_grafo_max gauge"]
+        for k, v in self.maximos.items():
+            out.append(f'{p}_grafo_max{{medida="{k}"}} {v}')
+        return "\n".join(out) + "\n"
+
+    def guardar(self, ruta: str):
+        """JSON si `ruta` termina en .json; si no, texto Prometheus (node_exporter textfile)."""
+        texto = (json.dumps(self.a_dict(), indent=2) if ruta.endswith(".json")
+                 else self.a_prometheus())
+        with open(ruta, "w", encoding="utf-8") as fid:
+            fid.write(texto)
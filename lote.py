@@ -0,0 +1,183 @@
+# lote.py
+# Verificación por lotes: muchos circuitos en una sola corrida.
+# Las tablas de flota (Trafos/Tramos/Usuarios/Curvas) traen en la columna
+# `col_circuito` el id del circuito (nodo del trafo); el resto de columnas
+# conserva el mismo orden que espera Verificar para un solo circuito.
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from Verificar import verificar_circuito
+import prefiltro
+from instrumento import Instrumento
+from reglas import por_circuito
+
+
+def _agrupar(tabla: np.ndarray, col_circuito: int = 0):
+    """
+    Agrupa las filas de `tabla` por id de circuito con un solo ordenamiento
+    (sort-and-split), en lugar de una máscara booleana por circuito.
+    Devuelve dict {circuito: filas sin la columna de id}; cada valor es una
+    vista contigua de la copia ordenada.
+    """
+    tabla = np.asarray(tabla, dtype=float)
+    if tabla.ndim != 2 or tabla.shape[0] == 0:
+        return {}
+    ids = tabla[:, col_circuito]
+    validos = ~np.isnan(ids)
+    if not np.all(validos):
+        tabla = tabla[validos]
+        ids = ids[validos]
+
+    orden = np.argsort(ids, kind="stable")
+    datos = np.delete(tabla[orden], col_circuito, axis=1)
+    ids_ord = ids[orden].astype(np.int64)
+
+    claves, inicios = np.unique(ids_ord, return_index=True)
+    fines = np.append(inicios[1:], ids_ord.size)
+    return {int(c): datos[i:f] for c, i, f in zip(claves, inicios, fines)}
+
+
+def _vacio(tabla) -> np.ndarray:
+    # Circuito sin filas en la tabla: matriz vacía con el ancho del formato por circuito
+    columnas = np.shape(tabla)[1] - 1 if np.ndim(tabla) == 2 else 0
+    return np.empty((0, max(columnas, 0)), dtype=float)
+
+
+def _verificar_uno(tarea, instrumento=None):
+    # Los workers no escriben informes: devuelven el Resultado al proceso padre
+    todos, DatosT, DatosL, DatosN, CurTemp, reglas = tarea
+    return verificar_circuito(DatosT, DatosL, DatosN, CurTemp, todos, instrumento, reglas)
+
+
+def _verificar_medido(tarea, umbral_s=None, uno=_verificar_uno):
+    # En un worker: las mediciones vuelven con el Resultado y se combinan en el padre
+    inst = Instrumento(umbral_s)
+    return uno(tarea, inst), inst
+
+
+def _datos_tarea(tarea):
+    # (DatosT, DatosL, DatosN, CurTemp) de una tarea, para la clave del caché
+    return tarea[1:5]
+
+
+def _tareas(DatosT, grupos_L, grupos_N, grupos_C, vacios, todos, reglas):
+    vL, vN, vC = vacios
+    for fila in DatosT:
+        circ = int(fila[0]) if not np.isnan(fila[0]) else -1
+        yield (
+            todos,
+            fila,
+            grupos_L.get(circ, vL),
+            grupos_N.get(circ, vN),
+            grupos_C.get(circ, vC),
+            reglas(circ),
+        )
+
+
+def VerificarLote(DatosT: np.ndarray, DatosL: np.ndarray, DatosN: np.ndarray, CurTemp: np.ndarray,
+                  procesos: int = None, chunksize: int = None, col_circuito: int = 0,
+                  todos: bool = False, sumidero=None, cache=None, instrumento: Instrumento = None,
+                  reglas=None):
+    """
+    Verifica todos los circuitos de la flota.
+        DatosT : una fila por trafo (mismo formato que Verificar; columna 0 = circuito).
+        DatosL, DatosN, CurTemp : tablas de flota con el id de circuito en `col_circuito`.
+        procesos : tamaño del pool (None -> os.cpu_count(); 0 o 1 -> sin pool).
+        chunksize : circuitos por envío a cada proceso (None -> automático).
+        todos : recolectar todos los errores de cada circuito (ver Verificar).
+        sumidero : destino opcional de los resultados (ver informe.py); se
+                   escribe solo desde este proceso.
+        cache : CacheResultados opcional (ver cache.py); los circuitos cuyo
+                contenido no cambió no se vuelven a verificar.
+        instrumento : Instrumento opcional (ver instrumento.py); acumula tiempos
+                      por etapa de los circuitos verificados (no de los del caché).
+        reglas : Reglas para toda la flota o dict {circuito: Reglas} (ver reglas.py);
+                 los circuitos sin entrada usan las reglas base.
+    Con todos=False los checks de trafo y curva (35, 36, 37, 2, 3, 4) se evalúan
+    antes para toda la flota (ver prefiltro.py): los circuitos que fallan ahí no
+    pasan por el pool ni el caché, y en el instrumento solo suman a la cuenta de
+    circuitos y de códigos.
+    Devuelve una lista de Resultado (circuito, codigo, hallazgos) en el orden
+    de las filas de DatosT.
+    """
+    DatosT = np.atleast_2d(np.asarray(DatosT, dtype=float))
+    if DatosT.size == 0:
+        return []
+
+    grupos_L = _agrupar(DatosL, col_circuito)
+    grupos_N = _agrupar(DatosN, col_circuito)
+    grupos_C = _agrupar(CurTemp, col_circuito)
+    vacios = (_vacio(DatosL), _vacio(DatosN), _vacio(CurTemp))
+    tareas = _tareas(DatosT, grupos_L, grupos_N, grupos_C, vacios, todos, por_circuito(reglas))
+    previos = None
+    if not todos:
+        m = prefiltro.medidas(DatosT, DatosL, DatosN, CurTemp, col_circuito)
+        previos = prefiltro.resultados(DatosT, prefiltro.codigos(DatosT, *m, reglas=reglas))
+    return _verificar_tareas(tareas, DatosT.shape[0], procesos, chunksize, todos, sumidero, cache,
+                             instrumento, previos=previos)
+
+
+def _verificar_tareas(tareas, n, procesos, chunksize, todos, sumidero, cache, instrumento,
+                      uno=_verificar_uno, datos=_datos_tarea, previos=None):
+    # Caché, pool y sumidero comunes a VerificarLote y VerificarAlmacen (almacen.py).
+    # `uno(tarea, instrumento)` verifica una tarea; `datos(tarea)` da sus 4 tablas y
+    # el último elemento de cada tarea son sus Reglas. `previos` ({índice: Resultado},
+    # del prefiltro) son los circuitos ya resueltos: sus tareas se saltean (en el
+    # instrumento cuentan con su código, sin tiempos).
+    out = [None] * n
+    claves = {}
+    indices = range(n)
+    if previos:
+        for i, res in previos.items():
+            out[i] = res
+            if instrumento is not None:
+                instrumento.registrar_resultado(res)
+        indices = [i for i in indices if i not in previos]
+        tareas = (t for i, t in enumerate(tareas) if i not in previos)
+    if cache is not None:
+        # solo van al pool los circuitos que no están en caché
+        pendientes = []
+        for i, t in zip(indices, tareas):
+            clave = cache.clave(*datos(t), todos=todos, reglas=t[-1])
+            out[i] = cache.obtener(clave)
+            if out[i] is None:
+                claves[i] = clave
+                pendientes.append((i, t))
+        indices = [i for i, _ in pendientes]
+        tareas = [t for _, t in pendientes]
+
+    nuevos = _ejecutar(tareas, len(indices), procesos, chunksize, instrumento, uno)
+    for i, res in zip(indices, nuevos):
+        out[i] = res
+    if cache is not None:
+        cache.guardar_varios((claves[i], out[i]) for i in indices)
+
+    if sumidero is not None:
+        for res in out:
+            sumidero.escribir(res)
+        sumidero.vaciar()
+    return out
+
+
+def _ejecutar(tareas, n, procesos, chunksize, instrumento=None, uno=_verificar_uno):
+    if procesos is None:
+        procesos = os.cpu_count() or 1
+    procesos = min(procesos, n)
+    if procesos <= 1:
+        return [uno(t, instrumento) for t in tareas]
+
+    if chunksize is None:
+        chunksize = max(1, n // (procesos * 4))
+    with ProcessPoolExecutor(max_workers=procesos) as ex:
+        if instrumento is None:
+            return list(ex.map(uno, tareas, chunksize=chunksize))
+        out = []
+        medido = partial(_verificar_medido, umbral_s=instrumento.umbral_s, uno=uno)
+        for res, inst in ex.map(medido, tareas, chunksize=chunksize):
+            instrumento.combinar(inst)
+            out.append(res)
+        return out
@@ -0,0 +1,137 @@
+# prefiltro.py
+# Prefiltro de flota: los checks 35, 36, 37, 2, 3 y 4 solo miran DatosT, la
+# curva de carga y si hay tramos/usuarios, así que se evalúan para toda la
+# flota en una sola pasada vectorizada. Los circuitos que fallan alguno ya
+# tienen su Resultado (el mismo que da verificar_circuito con todos=False) y
+# no llegan a las etapas de grafo; el resto sigue el camino normal.
+#
+#   m = medidas(DatosT, DatosL, DatosN, CurTemp)      # tablas de flota (formato VerificarLote)
+#   cod = codigos(DatosT, *m)                          # 0 = pasa el prefiltro
+#   rechazados = resultados(DatosT, cod)               # {fila de DatosT: Resultado}
+#
+# Con todos=True no se usa: ahí cada circuito corre todos sus checks igual.
+
+import numpy as np
+
+from informe import Hallazgo, Resultado
+from reglas import BASE, Reglas
+from Verificar import MENSAJES
+
+_ORDEN = np.array([35, 36, 37, 2, 3, 4])   # mismo orden que _CHECKS
+_BLOQUE = 1 << 20                          # valores por bloque al contar curvas grandes
+
+
+def _ids(DatosT) -> np.ndarray:
+    # id de circuito de cada fila (-1 si es NaN), como en VerificarLote
+    c = DatosT[:, 0]
+    return np.where(np.isnan(c), -1, c).astype(np.int64)
+
+
+def _columna(DatosT, k) -> np.ndarray:
+    return DatosT[:, k] if DatosT.shape[1] > k else np.full(DatosT.shape[0], np.nan)
+
+
+def _entero(x) -> np.ndarray:
+    # int(x) de _Analisis (-999 si es NaN), en float para no desbordar con inf
+    return np.where(np.isnan(x), -999, np.trunc(x))
+
+
+def _sin_columna(tabla, col):
+    # vista sin la columna de id cuando es la primera o la última (sin copiar)
+    if col in (0, -tabla.shape[1]):
+        return tabla[:, 1:]
+    if col in (-1, tabla.shape[1] - 1):
+        return tabla[:, :-1]
+    return np.delete(tabla, col, axis=1)
+
+
+def _signos(C):
+    # (positivos, negativos) por fila de la curva, por bloques de filas (sirve sobre memmap)
+    pos = np.zeros(C.shape[0], dtype=np.int64)
+    neg = np.zeros(C.shape[0], dtype=np.int64)
+    filas = max(_BLOQUE // max(C.shape[1], 1), 1)
+    for i in range(0, C.shape[0], filas):
+        b = C[i:i + filas]
+        pos[i:i + filas] = np.count_nonzero(b > 0, axis=1)
+        neg[i:i + filas] = np.count_nonzero(b < 0, axis=1)
+    return pos, neg
+
+
+def medidas(DatosT, DatosL, DatosN, CurTemp, col_circuito: int = 0):
+    """
+    Lo que el prefiltro necesita de cada fila de DatosT, a partir de tablas de
+    flota con el id de circuito en `col_circuito`:
+        (elementos de tramos, elementos de usuarios, elementos de curva,
+         valores > 0 de la curva, valores < 0 de la curva)
+    """
+    DatosT = np.atleast_2d(np.asarray(DatosT, dtype=float))
+    claves, inv = np.unique(_ids(DatosT), return_inverse=True)
+    inv = inv.ravel()
+
+    def por_circuito(tabla, pesos):
+        if tabla.ndim != 2 or tabla.shape[0] == 0:
+            return np.zeros(DatosT.shape[0], dtype=np.int64)
+        c = tabla[:, col_circuito]
+        ok = ~np.isnan(c)
+        c = c[ok].astype(np.int64)
+        pos = np.minimum(np.searchsorted(claves, c), claves.size - 1)
+        hit = claves[pos] == c
+        cuenta = np.bincount(pos[hit], weights=pesos[ok][hit], minlength=claves.size)
+        return cuenta.astype(np.int64)[inv]
+
+    out = []
+    for tabla in (DatosL, DatosN, CurTemp):
+        tabla = np.asarray(tabla, dtype=float)
+        ancho = max(tabla.shape[1] - 1, 0) if tabla.ndim == 2 else 0
+        out.append(por_circuito(tabla, np.full(len(tabla), ancho)))
+    C = np.asarray(CurTemp, dtype=float)
+    if C.ndim == 2 and C.shape[0]:
+        out.extend(por_circuito(C, s) for s in _signos(_sin_columna(C, col_circuito)))
+    else:
+        out.extend(np.zeros(DatosT.shape[0], dtype=np.int64) for _ in range(2))
+    return tuple(out)
+
+
+def _tipo_valido(ids, tipo, reglas) -> np.ndarray:
+    # error 2 según las reglas de cada circuito (ver reglas.por_circuito)
+    if reglas is None or isinstance(reglas, Reglas):
+        return np.isin(tipo, list((reglas or BASE).fases))
+    ok = np.isin(tipo, list(BASE.fases))
+    for r in set(reglas.values()):
+        filas = np.isin(ids, [c for c, x in reglas.items() if x == r])
+        ok[filas] = np.isin(tipo[filas], list(r.fases))
+    return ok
+
+
+def codigos(DatosT, elems_L, elems_N, elems_C, positivos_C, negativos_C, reglas=None) -> np.ndarray:
+    """
+    Primer error del prefiltro de cada fila de DatosT (0 = pasa y hay que
+    verificarlo completo). Las medidas son las de `medidas`; `reglas` como en
+    VerificarLote.
+    """
+    DatosT = np.atleast_2d(np.asarray(DatosT, dtype=float))
+    vp, vs = _columna(DatosT, 3), _columna(DatosT, 4)
+    topo = _entero(_columna(DatosT, 5))
+    falla = np.stack([
+        (elems_L == 0) & (elems_N == 0),                                        # 35
+        (elems_C > 0) & (positivos_C == 0) & (negativos_C == 0),                # 36
+        elems_C == 0,                                                           # 37
+        ~_tipo_valido(_ids(DatosT), _entero(_columna(DatosT, 2)), reglas),      # 2
+        ~(np.isfinite(vp) & np.isfinite(vs)) | (vp <= vs),                      # 3
+        (topo != 0) & (topo != 1),                                              # 4
+    ])
+    # Con valores negativos la suma de la curva puede anularse según el orden de
+    # suma: esos circuitos no se deciden acá si el 36 va antes que su primer error
+    incierto = negativos_C > 0
+    primero = falla.argmax(axis=0)
+    rechazo = falla.any(axis=0) & ~(incierto & (primero >= 1))
+    return np.where(rechazo, _ORDEN[primero], 0)
+
+
+def resultados(DatosT, cod) -> dict:
+    """{fila de DatosT: Resultado} de los circuitos rechazados por el prefiltro."""
+    DatosT = np.atleast_2d(np.asarray(DatosT, dtype=float))
+    filas = np.flatnonzero(cod)
+    ids = _ids(DatosT[filas]).tolist()
+    return {i: Resultado(c, [Hallazgo(k, [MENSAJES[k]])])
+            for i, c, k in zip(filas.tolist(), ids, cod[filas].tolist())}
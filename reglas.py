@@ -0,0 +1,212 @@
+# reglas.py
+# Conjuntos de reglas de verificación (norma de cada operador de red).
+# Un Reglas se compila una sola vez: matrices de compatibilidad de fases,
+# máscaras de fases de usuario y tablas de códigos válidos, para que cada check
+# sea una indexación de tabla. BASE son las reglas de siempre; otras normas se
+# cargan de un JSON con las claves a cambiar (el resto se hereda de BASE):
+#
+#   {
+#     "nombre": "operador X",
+#     "tramo_tramo":   {"1": [1, 4, 6, 7], ...},  # fases de tramo compatibles aguas abajo
+#     "tramo_usuario": {"4": [1, 2, 4], ...},     # fases de usuario que admite cada fase de tramo
+#     "fases_trafo":   {"1": [1, 2, 4], "3": [1, 2, 3, 4, 5, 6, 7]},  # tipos de trafo y sus fases
+#     "slack_usuario": {"1": [1, 2, 4]},          # fases de usuario en el slack (otros tipos: libre)
+#     "montaje": [1, 2], "material_fase": [1, 2], "material_neutro": [1, 2],
+#     "medidor": [1, 2], "estrato": [0, 1, 2, 3, 4, 5, 6], "clase_servicio": [1, ..., 11]
+#   }
+#
+#   r = cargar("operador_x.json")
+#   verificar_circuito(T, L, N, C, reglas=r)
+#   VerificarLote(..., reglas={circuito: r})      # por circuito; los demás usan BASE
+
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# Fases 1..7 (índice 0 = desconocida). Máscaras de fases de usuario: bit u
+# encendido si la fase de usuario u es admitida; el bit 0 es la fase de usuario
+# desconocida (nunca la admite un tramo de fase conocida).
+BIT_U = (1 << np.arange(8)).astype(np.uint8)
+LIBRE = np.uint8(0xFF)   # sin restricción
+
+_MAX_CODIGO = 4096   # tope de las tablas de códigos válidos
+
+_BASE = {
+    "nombre": "base",
+    "tramo_tramo": {
+        1: [1, 4, 6, 7],
+        2: [2, 4, 5, 7],
+        3: [3, 5, 6, 7],
+        4: [1, 2, 4, 7],
+        5: [2, 3, 5, 7],
+        6: [1, 3, 6, 7],
+        7: [1, 2, 3, 4, 5, 6, 7],  # si aplica cualquiera (dejar así para permitir 7 con todos)
+    },
+    "tramo_usuario": {
+        1: [1],
+        2: [2],
+        3: [3],
+        4: [1, 2, 4],
+        5: [2, 3, 5],
+        6: [1, 3, 6],
+        7: [1, 2, 3, 4, 5, 6, 7],  # si aplica cualquiera
+    },
+    "fases_trafo": {1: [1, 2, 4], 3: [1, 2, 3, 4, 5, 6, 7]},
+    "slack_usuario": {1: [1, 2, 4]},
+    "montaje": [1, 2],
+    "material_fase": [1, 2],
+    "material_neutro": [1, 2],
+    "medidor": [1, 2],
+    "estrato": [0, 1, 2, 3, 4, 5, 6],
+    "clase_servicio": list(range(1, 12)),
+}
+_POR_FASE = ("tramo_tramo", "tramo_usuario")
+_POR_TIPO = ("fases_trafo", "slack_usuario")
+_CODIGOS = ("montaje", "material_fase", "material_neutro", "medidor", "estrato", "clase_servicio")
+
+
+def _enteros(valores, clave) -> list:
+    try:
+        return sorted({int(v) for v in valores})
+    except (TypeError, ValueError) as exc:
+        raise ValueError(f"reglas: '{clave}' debe ser una lista de enteros") from exc
+
+
+def _normalizar(definicion: dict) -> dict:
+    desconocidas = set(definicion) - set(_BASE)
+    if desconocidas:
+        raise ValueError(f"reglas: claves desconocidas {sorted(desconocidas)}")
+    d = {"nombre": str(definicion.get("nombre", ""))}
+    for clave in _POR_FASE + _POR_TIPO:
+        tabla = definicion.get(clave, {})
+        if not isinstance(tabla, dict):
+            raise ValueError(f"reglas: '{clave}' debe ser un objeto {{código: [códigos]}}")
+        d[clave] = {int(k): _enteros(v, clave) for k, v in tabla.items()}
+    for clave in _POR_FASE:
+        fases = set(d[clave]).union(*d[clave].values())
+        if not fases <= set(range(1, 8)):
+            raise ValueError(f"reglas: '{clave}' solo admite fases 1..7")
+    for clave in _CODIGOS:
+        d[clave] = _enteros(definicion.get(clave, []), clave)
+        if d[clave] and not 0 <= d[clave][0] <= d[clave][-1] < _MAX_CODIGO:
+            raise ValueError(f"reglas: '{clave}' admite códigos entre 0 y {_MAX_CODIGO - 1}")
+    return d
+
+
+def _tabla_codigos(codigos) -> np.ndarray:
+    # tabla[c] = True si c es válido; la última posición (False) recibe los códigos fuera de rango
+    tabla = np.zeros((codigos[-1] + 2) if codigos else 1, dtype=bool)
+    tabla[codigos] = True
+    return tabla
+
+
+def _mascara(fases) -> np.uint8:
+    return np.uint8(np.bitwise_or.reduce(BIT_U[fases])) if fases else np.uint8(0)
+
+
+def valido(tabla: np.ndarray, codigos: np.ndarray) -> np.ndarray:
+    """True por elemento de `codigos` (enteros) si el código está en la tabla."""
+    fuera = tabla.size - 1
+    return tabla[np.where((codigos >= 0) & (codigos < fuera), codigos, fuera)]
+
+
+class Reglas:
+    """
+    Reglas compiladas.
+        comp_tt, comp_tu : (8, 8) compatibilidad tramo→tramo y tramo→usuario
+        incomp_tt        : pares de fases de tramo incompatibles en cualquier orden (error 30)
+        mascara_tu       : (8,) fases de usuario que admite cada fase de tramo (máscara, errores 23/31)
+        fases            : {tipo de trafo: tabla de fases válidas} (errores 2, 8, 16)
+        mascara_slack    : {tipo de trafo: máscara de usuarios en el slack} (error 23)
+        montaje, material_fase, material_neutro, medidor, estrato, clase_servicio : tablas para `valido`
+        huella           : hash del contenido (clave del caché de resultados)
+    """
+
+    def __init__(self, definicion: dict):
+        d = self.definicion = _normalizar(definicion)
+        self.nombre = d["nombre"]
+        self.huella = hashlib.blake2b(json.dumps(d, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+        self.comp_tt = np.zeros((8, 8), dtype=bool)   # compatible entre tramos consecutivos
+        self.comp_tu = np.zeros((8, 8), dtype=bool)   # compatible tramo→fase_usuario
+        for t, fases in d["tramo_tramo"].items():
+            self.comp_tt[t, fases] = True
+        for t, fases in d["tramo_usuario"].items():
+            self.comp_tu[t, fases] = True
+        self.incomp_tt = ~(self.comp_tt & self.comp_tt.T)
+        self.incomp_tt[0, :] = self.incomp_tt[:, 0] = False
+        self.mascara_tu = np.array([_mascara(np.flatnonzero(fila).tolist()) for fila in self.comp_tu],
+                                   dtype=np.uint8)
+
+        self.fases = {tipo: _tabla_codigos(f) for tipo, f in d["fases_trafo"].items()}
+        self.mascara_slack = {tipo: _mascara(f) for tipo, f in d["slack_usuario"].items()}
+        for clave in _CODIGOS:
+            setattr(self, clave, _tabla_codigos(d[clave]))
+
+    def __repr__(self):
+        return f"Reglas({self.nombre!r}, {self.huella[:8]})"
+
+    def __eq__(self, otro):
+        return isinstance(otro, Reglas) and otro.huella == self.huella
+
+    def __hash__(self):
+        return hash(self.huella)
+
+    def __reduce__(self):
+        # a los workers viaja la definición; cada proceso la compila una sola vez
+        return _compiladas, (self.huella, self.definicion)
+
+
+_COMPILADAS = {}   # huella -> Reglas ya compiladas en este proceso
+
+
+def _compiladas(huella: str, definicion: dict) -> Reglas:
+    r = _COMPILADAS.get(huella)
+    if r is None:
+        r = _COMPILADAS[huella] = Reglas(definicion)
+    return r
+
+
+BASE = Reglas(_BASE)
+_COMPILADAS[BASE.huella] = BASE
+
+_CARGADAS = {}   # (ruta, mtime) -> Reglas
+
+
+def desde_dict(definicion: dict, base: Reglas = BASE) -> Reglas:
+    """Reglas con las claves de `definicion` y el resto heredado de `base`."""
+    d = dict(base.definicion)
+    d.update(definicion)
+    r = Reglas(d)
+    return _COMPILADAS.setdefault(r.huella, r)
+
+
+def cargar(ruta: str, base: Reglas = BASE) -> Reglas:
+    """Reglas de un archivo JSON (ver arriba); se compila una vez por archivo y versión."""
+    clave = (os.path.abspath(ruta), os.path.getmtime(ruta))
+    r = _CARGADAS.get(clave)
+    if r is None:
+        with open(ruta, encoding="utf-8") as fid:
+            try:
+                definicion = json.load(fid)
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"{ruta}: JSON inválido ({exc})") from exc
+        if not isinstance(definicion, dict):
+            raise ValueError(f"{ruta}: se esperaba un objeto JSON")
+        definicion.setdefault("nombre", os.path.splitext(os.path.basename(ruta))[0])
+        r = _CARGADAS[clave] = desde_dict(definicion, base)
+    return r
+
+
+def por_circuito(reglas=None):
+    """
+    Selector circuito -> Reglas. `reglas` puede ser None (BASE para todos), un
+    Reglas (el mismo para todos) o un dict {circuito: Reglas} (los que falten, BASE).
+    """
+    if reglas is None:
+        return lambda circ: BASE
+    if isinstance(reglas, Reglas):
+        return lambda circ: reglas
+    return lambda circ: reglas.get(circ, BASE)
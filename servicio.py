@@ -0,0 +1,247 @@
+# servicio.py
+# Servicio HTTP local: mantiene importados Verificar/pandas y un pool de procesos
+# caliente entre pedidos, para que los scripts no paguen el arranque cada vez.
+#
+#   python cli.py servir --puerto 8765
+#
+#   GET  /salud                 {"ok": true, "procesos": n}
+#   GET  /metricas              texto Prometheus (ver instrumento.py)
+#   POST /verificar             {"directorio": "...", "todos": false}
+#                               o {"datos": {"DatosT": [...], "DatosL": [[...]], ...}}
+#                               -> Resultado.a_dict()
+#   POST /flota                 {"directorio": "...", "todos": false, "filas": 100000}
+#                               -> un Resultado JSON por línea, a medida que salen
+#
+# Ambos aceptan "reglas": ruta a un JSON de reglas (ver reglas.py); cada
+# proceso lo compila una sola vez.
+
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from cli import _rutas
+from flujo import verificar_flujo
+from ingesta import CURVAS, TRAMOS, USUARIOS, ErrorIngesta
+from instrumento import Instrumento
+from reglas import cargar
+from Verificar import verificar_circuito
+
+
+def _calentar():
+    # initializer de los workers: importar todo antes del primer pedido
+    import ingesta, Verificar  # noqa: F401
+
+
+class ErrorInterno(RuntimeError):
+    """Falla inesperada al verificar un pedido (se responde 500)."""
+
+
+def _verificar_pedido(tarea):
+    # corre en un worker: (directorio o tablas, todos, reglas)
+    #                     -> (Resultado | None, error | None, interno, Instrumento)
+    origen, todos, reglas = tarea
+    inst = Instrumento()
+    try:
+        if isinstance(origen, str):
+            from ingesta import leer_circuito
+            res = verificar_circuito(*leer_circuito(*_rutas(origen)), todos=todos, instrumento=inst,
+                                     reglas=reglas)
+        else:
+            res = verificar_circuito(*origen, todos=todos, instrumento=inst, reglas=reglas)
+    except (ErrorIngesta, OSError) as exc:
+        return None, str(exc), False, inst
+    except Exception as exc:
+        # cualquier otra falla vuelve como error, con las mediciones hechas hasta ahí
+        return None, f"{type(exc).__name__}: {exc}", True, inst
+    return res, None, False, inst
+
+
+def _tablas(datos: dict):
+    # listas JSON -> (DatosT, DatosL, DatosN, CurTemp). Una tabla vacía conserva
+    # sus columnas si las trae; si no ([]), toma las del formato (como un CSV
+    # con solo encabezado)
+    T = np.asarray(datos.get("DatosT", []), dtype=float).ravel()
+    out = [T]
+    for clave, esquema in (("DatosL", TRAMOS), ("DatosN", USUARIOS), ("CurTemp", CURVAS)):
+        x = np.asarray(datos.get(clave, []), dtype=float)
+        if x.size == 0:
+            x = np.empty((0, x.shape[1] if x.ndim == 2 else esquema.minimo))
+        out.append(np.atleast_2d(x))
+    return tuple(out)
+
+
+def _reglas(pedido: dict):
+    # "reglas" del pedido (ruta) -> Reglas, o None para las reglas base
+    ruta = pedido.get("reglas")
+    return cargar(str(ruta)) if ruta else None
+
+
+class Servicio:
+    """
+    Pool de procesos y métricas compartidos por todos los pedidos. Si muere un
+    worker (p. ej. sin memoria) el pool queda roto: se reemplaza por otro y el
+    pedido se reintenta una vez.
+    """
+
+    def __init__(self, procesos: int = None):
+        self.procesos = procesos or os.cpu_count() or 1
+        self.pool = self._nuevo_pool()
+        self.instrumento = Instrumento()
+        self._lock = threading.Lock()
+
+    def _nuevo_pool(self):
+        return ProcessPoolExecutor(max_workers=self.procesos, initializer=_calentar)
+
+    def _renovar(self, roto):
+        # reemplaza el pool roto (salvo que otro pedido ya lo haya hecho)
+        with self._lock:
+            if self.pool is roto:
+                self.pool = self._nuevo_pool()
+        roto.shutdown(wait=False)
+
+    def verificar(self, pedido: dict):
+        todos = bool(pedido.get("todos", False))
+        if "directorio" in pedido:
+            origen = str(pedido["directorio"])
+        elif "datos" in pedido:
+            origen = _tablas(pedido["datos"])
+        else:
+            raise ValueError("se espera 'directorio' o 'datos'")
+        tarea = (origen, todos, _reglas(pedido))
+        pool = self.pool
+        try:
+            res, error, interno, inst = pool.submit(_verificar_pedido, tarea).result()
+        except BrokenProcessPool:
+            self._renovar(pool)
+            res, error, interno, inst = self.pool.submit(_verificar_pedido, tarea).result()
+        with self._lock:
+            self.instrumento.combinar(inst)
+        if error:
+            raise ErrorInterno(error) if interno else ErrorIngesta(error)
+        return res
+
+    def flota(self, pedido: dict):
+        if "directorio" not in pedido:
+            raise ValueError("se espera 'directorio'")
+        reglas = _reglas(pedido)
+        enviados = 0
+        for intento in (0, 1):
+            pool, inst = self.pool, Instrumento()
+            try:
+                flujo = verificar_flujo(*_rutas(str(pedido["directorio"])), filas=int(pedido.get("filas", 100_000)),
+                                        todos=bool(pedido.get("todos", False)), ejecutor=pool,
+                                        instrumento=inst, reglas=reglas)
+                for k, res in enumerate(flujo):
+                    if k >= enviados:   # en el reintento se saltean los ya enviados
+                        enviados += 1
+                        yield res
+                break
+            except BrokenProcessPool:
+                if intento:
+                    raise
+                # se reintenta desde el principio: el reintento vuelve a medir los ya
+                # enviados, así que lo medido en este intento no se suma
+                inst = None
+                self._renovar(pool)
+            finally:
+                # también si el flujo se cortó por un error: lo medido hasta ahí cuenta
+                if inst is not None:
+                    with self._lock:
+                        self.instrumento.combinar(inst)
+
+    def cerrar(self):
+        self.pool.shutdown()
+
+
+def _mensaje(exc) -> str:
+    if isinstance(exc, (ErrorIngesta, ValueError, OSError, ErrorInterno)):
+        return str(exc)
+    return f"{type(exc).__name__}: {exc}"
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    servicio: Servicio = None
+
+    def _json(self, codigo: int, obj):
+        cuerpo = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+        self.send_response(codigo)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def _linea(self, obj):
+        self.wfile.write((json.dumps(obj, ensure_ascii=False) + "\n").encode("utf-8"))
+
+    def _pedido(self) -> dict:
+        largo = int(self.headers.get("Content-Length") or 0)
+        pedido = json.loads(self.rfile.read(largo) or b"{}")
+        if not isinstance(pedido, dict):
+            raise ValueError("el cuerpo debe ser un objeto JSON")
+        return pedido
+
+    def do_GET(self):
+        if self.path == "/salud":
+            self._json(200, {"ok": True, "procesos": self.servicio.procesos})
+        elif self.path == "/metricas":
+            with self.servicio._lock:
+                texto = self.servicio.instrumento.a_prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(texto)))
+            self.end_headers()
+            self.wfile.write(texto)
+        else:
+            self._json(404, {"error": f"ruta desconocida: {self.path}"})
+
+    def do_POST(self):
+        try:
+            pedido = self._pedido()
+            if self.path == "/verificar":
+                self._json(200, self.servicio.verificar(pedido).a_dict())
+            elif self.path == "/flota":
+                resultados = self.servicio.flota(pedido)
+                primero = next(resultados, None)   # errores de lectura antes de responder 200
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson; charset=utf-8")
+                self.end_headers()
+                self.close_connection = True
+                try:
+                    if primero is not None:
+                        self._linea(primero.a_dict())
+                        for res in resultados:
+                            self._linea(res.a_dict())
+                except Exception as exc:
+                    # ya se respondió 200: el error va como última línea
+                    self._linea({"error": _mensaje(exc)})
+            else:
+                self._json(404, {"error": f"ruta desconocida: {self.path}"})
+        except ErrorIngesta as exc:
+            self._json(422, {"error": str(exc)})
+        except (ValueError, OSError) as exc:
+            self._json(400, {"error": str(exc)})
+        except Exception as exc:
+            # falla inesperada (incluido un worker caído): 500 con el motivo, nunca una respuesta vacía
+            self._json(500, {"error": _mensaje(exc)})
+
+    def log_message(self, formato, *args):
+        pass   # sin log por pedido
+
+
+def servir(host: str = "127.0.0.1", puerto: int = 8765, procesos: int = None):
+    servicio = Servicio(procesos)
+    manejador = type("Manejador", (_Manejador,), {"servicio": servicio})
+    httpd = ThreadingHTTPServer((host, puerto), manejador)
+    print(f"verificando en http://{host}:{puerto} ({servicio.procesos} procesos)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        servicio.cerrar()
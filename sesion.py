@@ -0,0 +1,684 @@
+# sesion.py
+# Sesión de verificación incremental para corregir un circuito tramo a tramo.
+# Se crea con las 4 tablas y acepta altas, bajas y cambios de tramos y usuarios;
+# `resultado()` devuelve lo mismo que verificar_circuito sobre las tablas
+# actuales, pero solo re-evalúa los checks cuyas columnas cambiaron.
+#
+#   s = SesionVerificacion(DatosT, DatosL, DatosN, CurTemp)
+#   s.resultado().codigo            # 22 (islas)
+#   s.agregar_tramo([n1, n2, 7, ...])
+#   s.resultado().codigo            # 0
+#
+# La conexidad (22) y las cuentas de nodos y tramos (26/24) se mantienen con
+# cada edición, sin reconstruir el grafo; el slack en tramos (1) y los usuarios
+# fuera de tramos (14) también. El árbol radial (padre y fase entrante de cada
+# nodo, con raíz en el slack) se corrige localmente con cada alta o baja de
+# tramo, y el faseo radial (25, 23) se evalúa sobre él. El grafo CSR, el BFS y
+# las biconexas de Verificar solo se calculan para el faseo enmallado, para
+# listar los errores de 25 en el orden del BFS o si el slack no está en tramos.
+
+from bisect import insort
+from collections import deque
+
+import numpy as np
+
+from informe import Hallazgo, Resultado
+from reglas import LIBRE, Reglas
+from Verificar import (MENSAJES, _CHECKS, _Analisis, _carga_mal_conectada, _codigo_fase, _faseo,
+                       _por_nodo, _sin_fase_compatible)
+
+# Intermedios de _Analisis que dependen de cada columna editada
+_DERIVADOS = {
+    "L_topo": ("edges", "fase_tramo", "internado", "u_idx", "u_grafo", "slack_grafo",
+               "G", "arbol", "fase_arista", "ext", "fase_in", "biconexas"),
+    "L2": ("fase_tramo", "fase_arista", "fase_in"),
+    "N_filas": ("nod_u", "fase_u", "internado", "u_idx", "u_grafo"),
+    "N0": ("nod_u", "internado", "u_idx", "u_grafo"),
+    "N1": ("fase_u",),
+}
+
+# Columnas de las que depende cada check (T = trafo, C = curva, L<k>/N<k> = columna k)
+_DEPENDE = {
+    35: {"L_filas", "N_filas"}, 36: {"C"}, 37: {"C"},
+    2: {"T"}, 3: {"T"}, 4: {"T"}, 1: {"T", "L_topo"},
+    8: {"T", "L2"}, 9: {"L4"}, 11: {"L6"}, 13: {"L8"}, 29: {"L_topo"},
+    14: {"L_topo", "N0"}, 15: {"T", "L_filas", "N0"}, 34: {"T", "L_filas", "N0"}, 33: {"T", "L_filas", "N0"},
+    16: {"T", "N0", "N1"}, 18: {"N0", "N4"}, 19: {"N0", "N5"}, 20: {"N0", "N6"}, 27: {"T", "N1"},
+    22: {"T", "L_topo"}, 26: {"T", "L_topo"}, 24: {"T", "L_topo"},
+    25: {"T", "L_topo", "L2"}, 30: {"T", "L_topo", "L2"},
+    23: {"T", "L_topo", "L2", "N0", "N1"}, 31: {"T", "L_topo", "L2", "N0", "N1"},
+}
+_FILAS_L = {"L_filas", "L_topo", "L2", "L4", "L6", "L8"}
+_FILAS_N = {"N_filas", "N0", "N1", "N4", "N5", "N6"}
+# Checks cuyo resultado depende de qué otros fallaron (modo todos)
+_COMPUERTAS = {4, 22, 24, 26}
+# Checks de Verificar (los que la sesión evalúa por su cuenta recurren a estos
+# en los casos que no cubre)
+_COMPLETOS = dict(_CHECKS)
+
+
+def _ids(valores) -> list:
+    # mismo entero que el astype(int) de Verificar
+    return np.asarray(valores, dtype=float).astype(int).tolist()
+
+
+class _Tabla:
+    """
+    Filas editables con identificador estable (la posición física): las bajas
+    quedan marcadas y las altas van al final, así el orden de las filas vivas
+    es el de la tabla original con las ediciones aplicadas.
+    """
+
+    def __init__(self, datos):
+        d = np.asarray(datos, dtype=float)
+        if d.ndim != 2:
+            d = d.reshape(1, -1) if d.size else np.empty((0, 0))
+        self.datos = d.copy()
+        self.n = len(d)
+        self.vivo = np.ones(len(d), dtype=bool)
+        self.vivas = len(d)
+        self._actual = None
+
+    def __len__(self) -> int:
+        return self.vivas
+
+    def _validar(self, i: int):
+        if not (0 <= i < self.n and self.vivo[i]):
+            raise KeyError(f"no existe la fila {i}")
+
+    def _fila(self, fila) -> np.ndarray:
+        fila = np.asarray(fila, dtype=float).ravel()
+        if self.n == 0 and self.datos.shape[1] == 0:
+            self.datos = np.empty((0, fila.size))
+        if fila.size != self.datos.shape[1]:
+            raise ValueError(f"se esperaban {self.datos.shape[1]} columnas y llegaron {fila.size}")
+        return fila
+
+    def agregar(self, fila) -> int:
+        fila = self._fila(fila)
+        if self.n == len(self.datos):
+            extra = max(self.n, 8)
+            self.datos = np.vstack([self.datos, np.empty((extra, self.datos.shape[1]))])
+            self.vivo = np.concatenate([self.vivo, np.zeros(extra, dtype=bool)])
+        self.datos[self.n] = fila
+        self.vivo[self.n] = True
+        self.n += 1
+        self.vivas += 1
+        self._actual = None
+        return self.n - 1
+
+    def fila(self, i: int) -> np.ndarray:
+        self._validar(i)
+        return self.datos[i].copy()
+
+    def quitar(self, i: int):
+        self._validar(i)
+        self.vivo[i] = False
+        self.vivas -= 1
+        self._actual = None
+
+    def poner(self, i: int, fila):
+        self._validar(i)
+        self.datos[i] = self._fila(fila)
+        self._actual = None
+
+    def actual(self) -> np.ndarray:
+        if self._actual is None:
+            self._actual = self.datos[:self.n][self.vivo[:self.n]]
+        return self._actual
+
+
+class _Conexidad:
+    """
+    Nodos y tramos del grafo simple con sus componentes conexas (conjuntos
+    disjuntos con unión por tamaño). Al quitar la última arista entre dos nodos
+    se busca desde ambos extremos a la vez: si se encuentran siguen conectados;
+    si un lado se agota, ese lado (el más chico) pasa a ser otra componente.
+    """
+
+    def __init__(self):
+        self.grado = {}       # id -> apariciones como extremo de tramo (lazos incluidos)
+        self.pares = {}       # (min, max) -> filas con ese par (sin lazos)
+        self.vecinos = {}     # id -> set de ids vecinos
+        self.comp = {}        # id -> etiqueta de componente
+        self.miembros = {}    # etiqueta -> set de ids
+        self._etiqueta = 0
+
+    @property
+    def N(self) -> int:
+        return len(self.grado)
+
+    @property
+    def M(self) -> int:
+        return len(self.pares)
+
+    @property
+    def componentes(self) -> int:
+        return len(self.miembros)
+
+    def cargar(self, edges: np.ndarray):
+        """Carga inicial de todos los tramos a la vez ((M, 2) ids enteros)."""
+        nodos, veces = np.unique(edges, return_counts=True)
+        self.grado = dict(zip(nodos.tolist(), veces.tolist()))
+        self.vecinos = {x: set() for x in self.grado}
+        e = np.sort(edges[edges[:, 0] != edges[:, 1]], axis=1)
+        pares, veces = np.unique(e, axis=0, return_counts=True)
+        self.pares = dict(zip(map(tuple, pares.tolist()), veces.tolist()))
+        for a, b in self.pares:
+            self.vecinos[a].add(b)
+            self.vecinos[b].add(a)
+        for x in self.grado:
+            if x not in self.comp:
+                cola, vistos = [x], {x}
+                for y in cola:
+                    for z in self.vecinos[y]:
+                        if z not in vistos:
+                            vistos.add(z)
+                            cola.append(z)
+                self._nueva(vistos)
+
+    def _nueva(self, ids) -> int:
+        self._etiqueta += 1
+        self.miembros[self._etiqueta] = ids
+        for x in ids:
+            self.comp[x] = self._etiqueta
+        return self._etiqueta
+
+    def agregar(self, a: int, b: int) -> list:
+        """Suma un tramo; devuelve los nodos que recién aparecen."""
+        nuevos = []
+        for x in ((a,) if a == b else (a, b)):
+            if x not in self.grado:
+                self.grado[x] = 0
+                self.vecinos[x] = set()
+                self._nueva({x})
+                nuevos.append(x)
+        self.grado[a] += 1
+        self.grado[b] += 1
+        if a != b:
+            par = (min(a, b), max(a, b))
+            self.pares[par] = self.pares.get(par, 0) + 1
+            if self.pares[par] == 1:
+                self.vecinos[a].add(b)
+                self.vecinos[b].add(a)
+                self._unir(a, b)
+        return nuevos
+
+    def quitar(self, a: int, b: int) -> list:
+        """Resta un tramo; devuelve los nodos que dejan de aparecer."""
+        if a != b:
+            par = (min(a, b), max(a, b))
+            self.pares[par] -= 1
+            if self.pares[par] == 0:
+                del self.pares[par]
+                self.vecinos[a].discard(b)
+                self.vecinos[b].discard(a)
+                self._separar(a, b)
+        self.grado[a] -= 1
+        self.grado[b] -= 1
+        idos = []
+        for x in ((a,) if a == b else (a, b)):
+            if self.grado[x] == 0:
+                # sin tramos ya no tiene vecinos: es una componente de un solo nodo
+                del self.grado[x], self.vecinos[x]
+                del self.miembros[self.comp.pop(x)]
+                idos.append(x)
+        return idos
+
+    def _unir(self, a: int, b: int):
+        ca, cb = self.comp[a], self.comp[b]
+        if ca == cb:
+            return
+        if len(self.miembros[ca]) < len(self.miembros[cb]):
+            ca, cb = cb, ca
+        chico = self.miembros.pop(cb)
+        for x in chico:
+            self.comp[x] = ca
+        self.miembros[ca] |= chico
+
+    def _separar(self, a: int, b: int):
+        vistos = ({a}, {b})
+        colas = (deque([a]), deque([b]))
+        while True:
+            for k in (0, 1):
+                if not colas[k]:
+                    # el lado k se agotó sin tocar al otro: es una componente aparte
+                    self.miembros[self.comp[a]] -= vistos[k]
+                    self._nueva(vistos[k])
+                    return
+                x = colas[k].popleft()
+                for y in self.vecinos[x]:
+                    if y in vistos[1 - k]:
+                        return
+                    if y not in vistos[k]:
+                        vistos[k].add(y)
+                        colas[k].append(y)
+
+
+class _Arbol:
+    """
+    Bosque de expansión de la red (un árbol por componente; el del slack con
+    raíz en el slack), en arreglos densos por nodo: `padre` y `fase_in` (fase
+    del tramo entrante, la de su primera fila viva, como en Verificar).
+    Con cada tramo:
+        alta entre dos árboles : se re-enraiza el del lado sin slack en su
+                                 extremo (se invierte el camino a su raíz) y se cuelga
+        alta dentro de un árbol: queda como tramo extra (cierra un anillo)
+        baja de un tramo extra : nada que cambiar
+        baja de un tramo del árbol sin extras: el subárbol queda con raíz propia
+    Una baja del árbol habiendo extras puede tener reemplazo: ahí `valido` pasa a
+    False y el bosque se reconstruye (un recorrido) cuando un check lo pide.
+    """
+
+    def __init__(self, red: _Conexidad, fase):
+        self.red = red
+        self.fase = fase          # fila de DatosL -> código de fase (int)
+        self.slack = -1
+        self.valido = False
+        self.filas = {}           # (min, max) -> filas vivas con ese par, en orden (sin lazos)
+        self.extra = set()        # pares fuera del bosque
+        self._k = {}              # id -> índice denso (no se reutiliza)
+        self._orden = None        # (ids ordenados, índices) para `indice`
+        self.padre = np.full(0, -1, dtype=np.int64)
+        self.fase_in = np.zeros(0, dtype=np.int64)
+        self.en_red = np.zeros(0, dtype=bool)
+
+    def cargar(self, edges: np.ndarray):
+        """Filas de cada par de la carga inicial ((M, 2) ids enteros)."""
+        for i, (a, b) in enumerate(edges.tolist()):
+            if a != b:
+                self.filas.setdefault((min(a, b), max(a, b)), []).append(i)
+
+    def _indice(self, x: int) -> int:
+        k = self._k.get(x)
+        if k is None:
+            k = self._k[x] = len(self._k)
+            self._orden = None
+            if k == self.padre.size:
+                extra = max(k, 8)
+                self.padre = np.concatenate([self.padre, np.full(extra, -1, dtype=np.int64)])
+                self.fase_in = np.concatenate([self.fase_in, np.zeros(extra, dtype=np.int64)])
+                self.en_red = np.concatenate([self.en_red, np.zeros(extra, dtype=bool)])
+        return k
+
+    def indice(self, ids) -> np.ndarray:
+        """Índice denso de cada id (-1 si no es nodo de tramos)."""
+        ids = np.asarray(ids, dtype=np.int64)
+        if self._orden is None:
+            claves = np.fromiter(self._k, dtype=np.int64, count=len(self._k))
+            orden = np.argsort(claves)
+            self._orden = (claves[orden], orden)   # los índices son 0..K-1 en orden de alta
+        claves, valores = self._orden
+        if claves.size == 0:
+            return np.full(ids.shape, -1, dtype=np.int64)
+        pos = np.minimum(np.searchsorted(claves, ids), claves.size - 1)
+        k = np.where(claves[pos] == ids, valores[pos], -1)
+        return np.where((k >= 0) & self.en_red[np.maximum(k, 0)], k, -1)
+
+    def _nodo(self, x: int) -> int:
+        # nodo que entra a la red: árbol de un solo nodo
+        k = self._indice(x)
+        if not self.en_red[k]:
+            self.en_red[k] = True
+            self.padre[k] = -1
+            self.fase_in[k] = 0
+        return k
+
+    def _fase_par(self, par) -> int:
+        return self.fase(self.filas[par][0])
+
+    def _refrescar(self, par):
+        # cambió la primera fila viva del par: si es tramo del árbol, la fase de su hijo
+        ka, kb = self._k[par[0]], self._k[par[1]]
+        for hijo, otro in ((ka, kb), (kb, ka)):
+            if self.padre[hijo] == otro:
+                self.fase_in[hijo] = self._fase_par(par)
+
+    def _enraizar(self, k: int):
+        # k pasa a ser la raíz de su árbol: se invierte el camino k -> raíz
+        camino = [k]
+        p = int(self.padre[k])
+        while p >= 0:
+            camino.append(p)
+            p = int(self.padre[p])
+        for j in range(len(camino) - 1, 0, -1):
+            self.padre[camino[j]] = camino[j - 1]
+            self.fase_in[camino[j]] = self.fase_in[camino[j - 1]]
+        self.padre[k] = -1
+        self.fase_in[k] = 0
+
+    def agregar(self, i: int, a: int, b: int):
+        """Alta de la fila `i` (a, b); se llama antes de sumarla a la red."""
+        if a == b:
+            if self.valido:
+                self._nodo(a)
+            return
+        par = (min(a, b), max(a, b))
+        filas = self.filas.setdefault(par, [])
+        insort(filas, i)
+        if not self.valido:
+            return
+        comp = self.red.comp
+        ca, cb = comp.get(a), comp.get(b)
+        ka, kb = self._nodo(a), self._nodo(b)
+        if len(filas) > 1:
+            # paralelo: solo puede cambiar la fase del tramo
+            self._refrescar(par)
+        elif ca is not None and ca == cb:
+            self.extra.add(par)
+        else:
+            # se cuelga el árbol sin slack (o el más chico) del otro extremo
+            cs = comp.get(self.slack)
+            en_a = a == self.slack or (ca is not None and ca == cs)
+            en_b = b == self.slack or (cb is not None and cb == cs)
+            tam = self.red.miembros
+            if en_b or (not en_a and len(tam.get(ca, ())) < len(tam.get(cb, ()))):
+                ka, kb = kb, ka
+            self._enraizar(kb)
+            self.padre[kb] = ka
+            self.fase_in[kb] = self._fase_par(par)
+
+    def quitar(self, i: int, a: int, b: int, idos):
+        """Baja de la fila `i` (a, b), ya restada de la red (`idos`: nodos que dejaron de estar)."""
+        if a != b:
+            par = (min(a, b), max(a, b))
+            filas = self.filas[par]
+            filas.remove(i)
+            if not filas:
+                del self.filas[par]
+            if self.valido:
+                if filas:
+                    self._refrescar(par)
+                elif par in self.extra:
+                    self.extra.discard(par)
+                elif self.extra:
+                    self.valido = False
+                else:
+                    ka, kb = self._k[a], self._k[b]
+                    hijo = ka if self.padre[ka] == kb else kb
+                    self.padre[hijo] = -1
+                    self.fase_in[hijo] = 0
+        for x in idos:
+            k = self._k.get(x)
+            if k is not None:
+                self.en_red[k] = False
+
+    def cambio_fase(self, i: int, a: int, b: int):
+        """La fila `i` (a, b) cambió de fase."""
+        par = (min(a, b), max(a, b))
+        if self.valido and a != b and self.filas[par][0] == i:
+            self._refrescar(par)
+
+    def reconstruir(self):
+        """Bosque desde cero con un recorrido de la red (primero el árbol del slack)."""
+        red = self.red
+        self.padre[:] = -1
+        self.fase_in[:] = 0
+        self.en_red[:] = False
+        arbol = set()
+        vistos = set()
+        for inicio in ([self.slack] if self.slack in red.grado else []) + list(red.grado):
+            if inicio in vistos:
+                continue
+            vistos.add(inicio)
+            self._nodo(inicio)
+            cola = [inicio]
+            for y in cola:
+                ky = self._k[y]
+                for z in red.vecinos[y]:
+                    if z not in vistos:
+                        vistos.add(z)
+                        kz = self._nodo(z)
+                        par = (min(y, z), max(y, z))
+                        self.padre[kz] = ky
+                        self.fase_in[kz] = self._fase_par(par)
+                        arbol.add(par)
+                        cola.append(z)
+        self.extra = set(self.filas).difference(arbol)
+        self.valido = True
+
+
+class SesionVerificacion:
+    """
+    Verificación incremental de un circuito.
+        agregar_tramo(fila) -> id         quitar_tramo(id)     modificar_tramo(id, fila)
+        agregar_usuario(fila) -> id       quitar_usuario(id)   modificar_usuario(id, fila)
+        modificar_trafo(DatosT)           modificar_curva(CurTemp)
+        resultado(todos=False) -> Resultado (igual a verificar_circuito sobre tablas())
+    `reglas` (ver reglas.py) como en verificar_circuito.
+    Los ids de fila de DatosL/DatosN iniciales son su posición; las altas reciben
+    ids nuevos y conservan su lugar al final de la tabla.
+    """
+
+    def __init__(self, DatosT, DatosL, DatosN, CurTemp, reglas: Reglas = None):
+        self.reglas = reglas
+        self.T = np.asarray(DatosT, dtype=float).ravel().copy()
+        self.L = _Tabla(DatosL)
+        self.N = _Tabla(DatosN)
+        self.C = np.asarray(CurTemp, dtype=float)
+        self.red = _Conexidad()
+        self.arbol = _Arbol(self.red, lambda i: int(self.L.datos[i, 2:3].astype(int)[0]))
+        self.usuarios_en = {}   # id de nodo -> cantidad de usuarios
+        self.faltan = set()     # nodos con usuarios que no están en tramos (14)
+        L, N = self.L.actual(), self.N.actual()
+        if L.size:
+            self.red.cargar(L[:, :2].astype(int))
+            self.arbol.cargar(L[:, :2].astype(int))
+        if N.size:
+            nodos, veces = np.unique(N[:, 0].astype(int), return_counts=True)
+            self.usuarios_en = dict(zip(nodos.tolist(), veces.tolist()))
+            self.faltan = set(self.usuarios_en).difference(self.red.grado)
+        propios = {1: self._e1, 14: self._e14, 22: self._e22, 26: self._e26, 24: self._e24,
+                   25: self._e25, 23: self._e23}
+        self._checks = tuple((c, propios.get(c, f)) for c, f in _CHECKS)
+        self._a = None
+        self._cache = {}        # código -> (Hallazgo o None, checks fallados que lo condicionan)
+
+    # --- estado incremental ---
+    def _sumar_tramo(self, i, fila):
+        if fila.size < 2:
+            return
+        a, b = _ids(fila[:2])
+        self.arbol.agregar(i, a, b)
+        for x in self.red.agregar(a, b):
+            self.faltan.discard(x)
+
+    def _restar_tramo(self, i, fila):
+        if fila.size < 2:
+            return
+        a, b = _ids(fila[:2])
+        idos = self.red.quitar(a, b)
+        self.arbol.quitar(i, a, b, idos)
+        for x in idos:
+            if self.usuarios_en.get(x):
+                self.faltan.add(x)
+
+    def _sumar_usuario(self, fila):
+        if fila.size < 1:
+            return
+        u = _ids(fila[:1])[0]
+        self.usuarios_en[u] = self.usuarios_en.get(u, 0) + 1
+        if u not in self.red.grado:
+            self.faltan.add(u)
+
+    def _restar_usuario(self, fila):
+        if fila.size < 1:
+            return
+        u = _ids(fila[:1])[0]
+        self.usuarios_en[u] -= 1
+        if self.usuarios_en[u] == 0:
+            del self.usuarios_en[u]
+            self.faltan.discard(u)
+
+    def _invalidar(self, columnas):
+        for c in [c for c, dep in _DEPENDE.items() if dep & columnas]:
+            self._cache.pop(c, None)
+        if self._a is not None:
+            calc = self._a.__dict__
+            for col in columnas:
+                for nombre in _DERIVADOS.get(col, ()):
+                    calc.pop(nombre, None)
+
+    @staticmethod
+    def _cambios(prefijo, vieja, nueva) -> set:
+        iguales = (vieja == nueva) | (np.isnan(vieja) & np.isnan(nueva))
+        return {f"{prefijo}{k}" for k in np.flatnonzero(~iguales).tolist()}
+
+    # --- ediciones ---
+    def agregar_tramo(self, fila) -> int:
+        i = self.L.agregar(fila)
+        self._sumar_tramo(i, self.L.datos[i])
+        self._invalidar(_FILAS_L)
+        return i
+
+    def quitar_tramo(self, i: int):
+        fila = self.L.fila(i)
+        self.L.quitar(i)
+        self._restar_tramo(i, fila)
+        self._invalidar(_FILAS_L)
+
+    def modificar_tramo(self, i: int, fila):
+        vieja = self.L.fila(i)
+        self.L.poner(i, fila)
+        nueva = self.L.datos[i]
+        cambios = self._cambios("L", vieja, nueva)
+        if cambios & {"L0", "L1"}:
+            self._restar_tramo(i, vieja)
+            self._sumar_tramo(i, nueva)
+            cambios.add("L_topo")
+        elif "L2" in cambios:
+            self.arbol.cambio_fase(i, *_ids(nueva[:2]))
+        self._invalidar(cambios)
+
+    def agregar_usuario(self, fila) -> int:
+        i = self.N.agregar(fila)
+        self._sumar_usuario(self.N.datos[i])
+        self._invalidar(_FILAS_N)
+        return i
+
+    def quitar_usuario(self, i: int):
+        fila = self.N.fila(i)
+        self.N.quitar(i)
+        self._restar_usuario(fila)
+        self._invalidar(_FILAS_N)
+
+    def modificar_usuario(self, i: int, fila):
+        vieja = self.N.fila(i)
+        self.N.poner(i, fila)
+        nueva = self.N.datos[i]
+        cambios = self._cambios("N", vieja, nueva)
+        if "N0" in cambios:
+            self._restar_usuario(vieja)
+            self._sumar_usuario(nueva)
+        self._invalidar(cambios)
+
+    def modificar_trafo(self, DatosT):
+        # cambia slack, tipo o topología: todo se vuelve a evaluar
+        self.T = np.asarray(DatosT, dtype=float).ravel().copy()
+        self._a = None
+        self._cache.clear()
+
+    def modificar_curva(self, CurTemp):
+        self.C = np.asarray(CurTemp, dtype=float)
+        if self._a is not None:
+            self._a.CurTemp = self.C
+        self._invalidar({"C"})
+
+    # --- checks mantenidos por la sesión (mismos textos que Verificar) ---
+    def _e1(self, a):
+        if a.DatosL.size and a.slack != -1 and a.slack not in self.red.grado:
+            return Hallazgo(1, [MENSAJES[1]])
+
+    def _e14(self, a):
+        if a.DatosN.size and a.DatosL.size and self.faltan:
+            return _por_nodo(14, MENSAJES[14], sorted(self.faltan))
+
+    def _e22(self, a):
+        if a.DatosL.size and self.red.componentes > 1:
+            return Hallazgo(22, [MENSAJES[22]])
+
+    def _e26(self, a):
+        if a.DatosL.size and 22 not in a.fallados:
+            if self.red.M == self.red.N - 1 and a.topo == 0:
+                return Hallazgo(26, [MENSAJES[26]])
+
+    def _e24(self, a):
+        if a.DatosL.size and 22 not in a.fallados:
+            if self.red.M >= self.red.N and a.topo == 1:
+                return Hallazgo(24, [MENSAJES[24]])
+
+    def _bosque(self, a) -> _Arbol:
+        arbol = self.arbol
+        if arbol.slack != a.slack:
+            arbol.slack = a.slack
+            arbol.valido = False
+        if not arbol.valido:
+            arbol.reconstruir()
+        return arbol
+
+    def _e25(self, a):
+        if not _faseo(a, 1):
+            return None
+        if a.slack not in self.red.grado:
+            return _COMPLETOS[25](a)
+        # con el radial bien declarado la red es un árbol: el bosque es el árbol BFS
+        arbol = self._bosque(a)
+        padre = arbol.padre
+        v = np.flatnonzero(arbol.en_red & (padre >= 0))
+        p = padre[v]
+        v, p = v[padre[p] >= 0], p[padre[p] >= 0]
+        f1 = _codigo_fase(arbol.fase_in[v])
+        f2 = _codigo_fase(arbol.fase_in[p])
+        if np.any((f1 == 0) | (f2 == 0) | ~a.reglas.comp_tt[f2, f1]):
+            # el informe lista los tramos en el orden del BFS de Verificar
+            return _COMPLETOS[25](a)
+
+    def _e23(self, a):
+        if not (_faseo(a, 1) and a.DatosN.size):
+            return None
+        if a.slack not in self.red.grado:
+            return _COMPLETOS[23](a)
+        arbol = self._bosque(a)
+        fase_in = _codigo_fase(arbol.fase_in)
+        masc = np.where(fase_in != 0, a.reglas.mascara_tu[fase_in], LIBRE)
+        masc[arbol._k[a.slack]] = a.reglas.mascara_slack.get(a.tipo, LIBRE)
+        nod_u = a.nod_u
+        malo = _sin_fase_compatible(masc, arbol.indice(nod_u), _codigo_fase(a.fase_u), LIBRE)
+        if np.any(malo):
+            # nodos con alguna carga mala, en orden de primera aparición del nodo
+            nodos, primero = np.unique(nod_u, return_index=True)
+            malos = np.unique(nod_u[malo])
+            orden = np.argsort(primero[np.searchsorted(nodos, malos)])
+            return _carga_mal_conectada(23, malos[orden].tolist())
+
+    # --- resultado ---
+    def tablas(self):
+        """(DatosT, DatosL, DatosN, CurTemp) actuales."""
+        return self.T.copy(), self.L.actual(), self.N.actual(), self.C
+
+    def _analisis(self) -> _Analisis:
+        if self._a is None:
+            self._a = _Analisis(self.T, self.L.actual(), self.N.actual(), self.C, reglas=self.reglas)
+        else:
+            self._a.DatosL = self.L.actual()
+            self._a.DatosN = self.N.actual()
+        return self._a
+
+    def resultado(self, todos: bool = False) -> Resultado:
+        a = self._analisis()
+        a.fallados = set()
+        res = Resultado(a.circ)
+        for codigo, check in self._checks:
+            compuerta = frozenset(a.fallados & _COMPUERTAS)
+            previo = self._cache.get(codigo)
+            if previo is not None and previo[1] == compuerta:
+                h = previo[0]
+            else:
+                h = check(a)
+                self._cache[codigo] = (h, compuerta)
+            if h:
+                res.hallazgos.append(h)
+                if not todos:
+                    break
+                a.fallados.add(codigo)
+        return res